@@ -7,83 +7,100 @@ for the automated email-to-PDF processing agent.
 """
 
 import os
-from typing import Dict, List
+from dataclasses import dataclass, field, fields
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Settings that are kept out of get_config_dict()
+API_KEY_FIELDS = ('google_api_key', 'openai_api_key', 'anthropic_api_key')
+
+def _split_env(name: str) -> Tuple[str, ...]:
+    """Comma-separated environment variable as a tuple of non-empty items"""
+    value = os.environ.get(name, '')
+    return tuple(item.strip() for item in value.split(',') if item.strip())
+
+@dataclass(frozen=True)
 class EmailPDFConfig:
-    """Configuration class for Email PDF Agent"""
+    """Configuration for Email PDF Agent (parsed once, see CONFIG)"""
     
     # Email monitoring settings
-    IMAP_SERVER = os.getenv('IMAP_SERVER', 'imap.gmail.com')
-    IMAP_PORT = int(os.getenv('IMAP_PORT', '993'))
-    EMAIL_ADDRESS = os.getenv('EMAIL_ADDRESS')  # Email to monitor
-    EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')  # App password
-    MONITOR_FOLDER = os.getenv('MONITOR_FOLDER', 'INBOX')
+    imap_server: str = 'imap.gmail.com'
+    imap_port: int = 993
+    email_address: Optional[str] = None  # Email to monitor
+    email_password: Optional[str] = field(default=None, repr=False)  # App password
+    monitor_folder: str = 'INBOX'
     
     # Email sending settings
-    SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
-    SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
-    SENDER_EMAIL = os.getenv('SENDER_EMAIL')  # Email to send from
-    SENDER_PASSWORD = os.getenv('SENDER_PASSWORD')  # App password
-    RECIPIENT_EMAIL = os.getenv('RECIPIENT_EMAIL')  # Where to send summaries
+    smtp_server: str = 'smtp.gmail.com'
+    smtp_port: int = 587
+    sender_email: Optional[str] = None  # Email to send from
+    sender_password: Optional[str] = field(default=None, repr=False)  # App password
+    recipient_email: Optional[str] = None  # Where to send summaries
     
     # Processing settings
-    CHECK_INTERVAL = int(os.getenv('CHECK_INTERVAL', '60'))  # seconds
-    MAX_PDF_SIZE = int(os.getenv('MAX_PDF_SIZE', '10485760'))  # 10MB
-    PROCESS_ALL_PDFS = os.getenv('PROCESS_ALL_PDFS', 'true').lower() == 'true'
+    check_interval: int = 60  # seconds
+    max_pdf_size: int = 10485760  # 10MB
+    process_all_pdfs: bool = True
     
     # LLM settings
-    MODEL_PROVIDER = os.getenv('MODEL_PROVIDER', 'google')  # google, openai or anthropic
-    MODEL_NAME = os.getenv('MODEL_NAME', 'gemini-1.5-flash')
-    GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
-    OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-    ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
-    MAX_TOKENS = int(os.getenv('MAX_TOKENS', '4000'))
-    TEMPERATURE = float(os.getenv('TEMPERATURE', '0.1'))
+    model_provider: str = 'google'  # google, openai or anthropic
+    model_name: str = 'gemini-1.5-flash'
+    google_api_key: Optional[str] = field(default=None, repr=False)
+    openai_api_key: Optional[str] = field(default=None, repr=False)
+    anthropic_api_key: Optional[str] = field(default=None, repr=False)
+    max_tokens: int = 4000
+    temperature: float = 0.1
     
     # Filtering settings (optional)
-    SENDER_WHITELIST = os.getenv('SENDER_WHITELIST', '').split(',') if os.getenv('SENDER_WHITELIST') else []
-    SUBJECT_KEYWORDS = os.getenv('SUBJECT_KEYWORDS', '').split(',') if os.getenv('SUBJECT_KEYWORDS') else []
+    sender_whitelist: FrozenSet[str] = frozenset()
+    subject_keywords: Tuple[str, ...] = ()
     
     @classmethod
-    def get_config_dict(cls) -> Dict:
-        """Get configuration as dictionary"""
-        return {
-            'imap_server': cls.IMAP_SERVER,
-            'imap_port': cls.IMAP_PORT,
-            'email_address': cls.EMAIL_ADDRESS,
-            'email_password': cls.EMAIL_PASSWORD,
-            'monitor_folder': cls.MONITOR_FOLDER,
-            'smtp_server': cls.SMTP_SERVER,
-            'smtp_port': cls.SMTP_PORT,
-            'sender_email': cls.SENDER_EMAIL,
-            'sender_password': cls.SENDER_PASSWORD,
-            'recipient_email': cls.RECIPIENT_EMAIL,
-            'check_interval': cls.CHECK_INTERVAL,
-            'max_pdf_size': cls.MAX_PDF_SIZE,
-            'process_all_pdfs': cls.PROCESS_ALL_PDFS,
-            'model_provider': cls.MODEL_PROVIDER,
-            'model_name': cls.MODEL_NAME,
-            'max_tokens': cls.MAX_TOKENS,
-            'temperature': cls.TEMPERATURE,
-            'sender_whitelist': cls.SENDER_WHITELIST,
-            'subject_keywords': cls.SUBJECT_KEYWORDS,
-        }
+    def from_env(cls) -> 'EmailPDFConfig':
+        """Build the configuration from environment variables"""
+        env = os.environ.get
+        return cls(
+            imap_server=env('IMAP_SERVER', 'imap.gmail.com'),
+            imap_port=int(env('IMAP_PORT', '993')),
+            email_address=env('EMAIL_ADDRESS'),
+            email_password=env('EMAIL_PASSWORD'),
+            monitor_folder=env('MONITOR_FOLDER', 'INBOX'),
+            smtp_server=env('SMTP_SERVER', 'smtp.gmail.com'),
+            smtp_port=int(env('SMTP_PORT', '587')),
+            sender_email=env('SENDER_EMAIL'),
+            sender_password=env('SENDER_PASSWORD'),
+            recipient_email=env('RECIPIENT_EMAIL'),
+            check_interval=int(env('CHECK_INTERVAL', '60')),
+            max_pdf_size=int(env('MAX_PDF_SIZE', '10485760')),
+            process_all_pdfs=env('PROCESS_ALL_PDFS', 'true').lower() == 'true',
+            model_provider=env('MODEL_PROVIDER', 'google'),
+            model_name=env('MODEL_NAME', 'gemini-1.5-flash'),
+            google_api_key=env('GOOGLE_API_KEY'),
+            openai_api_key=env('OPENAI_API_KEY'),
+            anthropic_api_key=env('ANTHROPIC_API_KEY'),
+            max_tokens=int(env('MAX_TOKENS', '4000')),
+            temperature=float(env('TEMPERATURE', '0.1')),
+            sender_whitelist=frozenset(s.lower() for s in _split_env('SENDER_WHITELIST')),
+            subject_keywords=_split_env('SUBJECT_KEYWORDS'),
+        )
     
-    @classmethod
-    def validate_config(cls) -> List[str]:
+    def get_config_dict(self) -> Dict:
+        """Get configuration as dictionary (API keys excluded)"""
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name not in API_KEY_FIELDS}
+    
+    def validate_config(self) -> List[str]:
         """Validate configuration and return list of missing items"""
         missing = []
         
         required_fields = [
-            ('EMAIL_ADDRESS', cls.EMAIL_ADDRESS),
-            ('EMAIL_PASSWORD', cls.EMAIL_PASSWORD),
-            ('SENDER_EMAIL', cls.SENDER_EMAIL),
-            ('SENDER_PASSWORD', cls.SENDER_PASSWORD),
-            ('RECIPIENT_EMAIL', cls.RECIPIENT_EMAIL),
+            ('EMAIL_ADDRESS', self.email_address),
+            ('EMAIL_PASSWORD', self.email_password),
+            ('SENDER_EMAIL', self.sender_email),
+            ('SENDER_PASSWORD', self.sender_password),
+            ('RECIPIENT_EMAIL', self.recipient_email),
         ]
         
         for field_name, field_value in required_fields:
@@ -91,15 +108,18 @@ class EmailPDFConfig:
                 missing.append(field_name)
         
         # Check API keys
-        if cls.MODEL_PROVIDER == 'openai' and not cls.OPENAI_API_KEY:
+        if self.model_provider == 'openai' and not self.openai_api_key:
             missing.append('OPENAI_API_KEY')
-        elif cls.MODEL_PROVIDER == 'anthropic' and not cls.ANTHROPIC_API_KEY:
+        elif self.model_provider == 'anthropic' and not self.anthropic_api_key:
             missing.append('ANTHROPIC_API_KEY')
-        elif cls.MODEL_PROVIDER == 'google' and not cls.GOOGLE_API_KEY:
+        elif self.model_provider == 'google' and not self.google_api_key:
             missing.append('GOOGLE_API_KEY')
         
         return missing
 
+# Configuration read once at import
+CONFIG = EmailPDFConfig.from_env()
+
 # Configuration template for .env file
 ENV_TEMPLATE = """
 # Email PDF Agent Configuration
@@ -153,7 +173,7 @@ MAX_TOKENS=4000
 TEMPERATURE=0.1
 
 # === FILTERING (OPTIONAL) ===
-# Comma-separated list of sender email addresses to process (leave empty for all)
+# Comma-separated list of sender email addresses or domains to process (leave empty for all)
 # SENDER_WHITELIST=important@company.com,boss@work.com
 
 # Comma-separated list of subject keywords to look for (leave empty for all)
@@ -6,18 +6,95 @@ Configuration settings for the Legal Case Processing System
 """
 
 import os
+import re
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
+try:
+    import ahocorasick
+except ImportError:
+    # Optional: keywords fall back to a precompiled regex
+    ahocorasick = None
 
-# Load environment variables
-load_dotenv()
+# Keyword and location lists, built once at import
+LEGAL_KEYWORDS = (
+    'case', 'claim', 'accident', 'injury', 'medical records',
+    'police report', 'demand letter', 'settlement', 'litigation',
+    'plaintiff', 'defendant', 'attorney', 'lawyer', 'law firm',
+    'insurance', 'liability', 'damages', 'auto accident',
+    'slip and fall', 'personal injury', 'workers comp',
+    'premises liability', 'product liability', 'medical malpractice',
+    'wrongful death', 'pain and suffering', 'loss of consortium'
+)
+
+# Strong indicators looked for in the body of emails without PDFs
+STRONG_LEGAL_KEYWORDS = LEGAL_KEYWORDS[:5]
+
+HIGH_RISK_KEYWORDS = (
+    'wrongful death', 'catastrophic injury', 'permanent disability',
+    'traumatic brain injury', 'spinal cord injury', 'amputation',
+    'severe burns', 'multiple surgeries', 'ongoing treatment'
+)
+
+TORT_FRIENDLY_LOCATIONS = (
+    'Los Angeles', 'San Francisco', 'New York', 'Chicago',
+    'Philadelphia', 'Miami', 'Atlanta', 'Boston', 'Seattle'
+)
+
+TORT_HOSTILE_LOCATIONS = (
+    'Salt Lake City', 'Wichita', 'Oklahoma City', 'Tucson',
+    'Virginia Beach', 'Colorado Springs', 'Mesa', 'Omaha'
+)
+
+LAW_FIRM_DOMAINS = (
+    '.law', 'legal', 'attorney', 'lawyer', 'esq', 'lawfirm',
+    'counselor', 'advocate', 'barrister', 'solicitor'
+)
+
+GENERIC_DOMAINS = (
+    'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com',
+    'aol.com', 'icloud.com', 'me.com', 'mac.com',
+    'proton.me', 'protonmail.com'
+)
+
+def _build_ahocorasick(keywords):
+    """Aho-Corasick automaton over the keywords (None without pyahocorasick)"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+# Keyword matchers shared by every monitor
+LEGAL_KW_AUTOMATON = _build_ahocorasick(LEGAL_KEYWORDS)
+
+# Fallback without pyahocorasick: one regex pass, longest keyword first.
+# The lookahead lets matches overlap, like the automaton's.
+LEGAL_KW_PATTERN = re.compile('(?=(' + '|'.join(
+    re.escape(keyword) for keyword in sorted(LEGAL_KEYWORDS, key=len, reverse=True)
+) + '))')
+
+# Law firm hints matched in the domain part of a sender address only
+LAW_FIRM_SENDER_PATTERN = re.compile(r'@[^>\s]*(?:' + '|'.join(
+    re.escape(domain) + (r'\b' if domain.startswith('.') else '') for domain in LAW_FIRM_DOMAINS
+) + ')', re.IGNORECASE)
 
 class LegalCaseConfig:
     """Configuration for Legal Case Processing System"""
     
     @staticmethod
+    @lru_cache(maxsize=1)
     def get_config_dict():
-        """Get configuration dictionary for legal case processing"""
+        """Get configuration dictionary for legal case processing
+        
+        Built once per process, which is also when .env is loaded; call
+        get_config_dict.cache_clear() after changing the environment.
+        """
+        # Variables already set in the environment take precedence
+        load_dotenv(override=False)
+        
         return {
             # Email monitoring settings
             'imap_server': os.getenv('IMAP_SERVER', 'imap.gmail.com'),
@@ -36,6 +113,7 @@ class LegalCaseConfig:
             # Processing settings
             'check_interval': int(os.getenv('CHECK_INTERVAL', '300')),  # 5 minutes for legal cases
             'max_pdf_size': int(os.getenv('MAX_PDF_SIZE', '20971520')),  # 20MB for legal documents
+            'max_concurrent_llm': int(os.getenv('MAX_CONCURRENT_LLM', '8')),  # parallel police report extractions
             'process_all_pdfs': True,  # Always process all PDFs for legal cases
             
             # LLM settings
@@ -45,44 +123,20 @@ class LegalCaseConfig:
             'temperature': float(os.getenv('TEMPERATURE', '0.1')),
             
             # Legal case specific settings
-            'legal_keywords': [
-                'case', 'claim', 'accident', 'injury', 'medical records',
-                'police report', 'demand letter', 'settlement', 'litigation',
-                'plaintiff', 'defendant', 'attorney', 'lawyer', 'law firm',
-                'insurance', 'liability', 'damages', 'auto accident',
-                'slip and fall', 'personal injury', 'workers comp',
-                'premises liability', 'product liability', 'medical malpractice',
-                'wrongful death', 'pain and suffering', 'loss of consortium'
-            ],
+            'legal_keywords': LEGAL_KEYWORDS,
             
             # Risk analysis settings
-            'high_risk_keywords': [
-                'wrongful death', 'catastrophic injury', 'permanent disability',
-                'traumatic brain injury', 'spinal cord injury', 'amputation',
-                'severe burns', 'multiple surgeries', 'ongoing treatment'
-            ],
+            'high_risk_keywords': HIGH_RISK_KEYWORDS,
             
             # Location risk databases (simplified)
-            'tort_friendly_locations': [
-                'Los Angeles', 'San Francisco', 'New York', 'Chicago',
-                'Philadelphia', 'Miami', 'Atlanta', 'Boston', 'Seattle'
-            ],
+            'tort_friendly_locations': TORT_FRIENDLY_LOCATIONS,
             
-            'tort_hostile_locations': [
-                'Salt Lake City', 'Wichita', 'Oklahoma City', 'Tucson',
-                'Virginia Beach', 'Colorado Springs', 'Mesa', 'Omaha'
-            ],
+            'tort_hostile_locations': TORT_HOSTILE_LOCATIONS,
             
             # Attorney verification settings
-            'law_firm_domains': [
-                '.law', 'legal', 'attorney', 'lawyer', 'esq', 'lawfirm',
-                'counselor', 'advocate', 'barrister', 'solicitor'
-            ],
+            'law_firm_domains': LAW_FIRM_DOMAINS,
             
-            'generic_domains': [
-                'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com',
-                'aol.com', 'icloud.com', 'me.com', 'mac.com'
-            ],
+            'generic_domains': GENERIC_DOMAINS,
             
             # Report settings
             'include_location_analysis': True,
@@ -268,6 +322,7 @@ OPENAI_API_KEY=your-openai-api-key
 
 # Processing Settings
 MAX_PDF_SIZE=20971520
+MAX_CONCURRENT_LLM=8
 """
 
 def create_env_template():
@@ -6,32 +6,44 @@ Clean, configurable implementation with proper error handling
 
 import os
 import sys
+import argparse
+import asyncio
+import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import AsyncIterator, Iterator, List, Optional, Union
 
 from agno.agent import Agent
 from agno.knowledge.pdf import PDFKnowledgeBase
 from agno.models.openai import OpenAIChat
-from agno.embedder.openai import OpenAIEmbedder
-from agno.vectordb.lancedb import LanceDb, SearchType
+from agno.vectordb.distance import Distance
+from agno.vectordb.lancedb import SearchType
 from agno.tools.reasoning import ReasoningTools
 
 from config import PDFAgentConfig
+from knowledge_store import (
+    ArrowLanceDb, CachedOpenAIEmbedder, ParallelPDFKnowledgeBase, build_search_indexes,
+    sync_documents, vector_dimensions_match,
+)
 
 class PDFKnowledgeAgent:
     """Production-ready PDF Knowledge Base Agent"""
     
-    def __init__(self, pdf_paths: Optional[List[str]] = None, config: Optional[PDFAgentConfig] = None):
+    def __init__(self, pdf_paths: Optional[List[str]] = None, config: Optional[PDFAgentConfig] = None,
+                 deep: bool = False):
         """
         Initialize the PDF Knowledge Agent
         
         Args:
             pdf_paths: List of PDF file paths to process
             config: Configuration object (uses default if None)
+            deep: Use the tool-calling agent with reasoning tools
         """
         self.config = config or PDFAgentConfig
         self.pdf_paths = pdf_paths or [self.config.DEFAULT_PDF_PATH]
+        self.deep = deep or self.config.ENABLE_REASONING
         self.agent = None
+        self.fast_agent = None
+        self.embedder = None
         self._validate_setup()
     
     def _validate_setup(self):
@@ -57,39 +69,52 @@ class PDFKnowledgeAgent:
         # Prepare PDF sources with metadata
         pdf_sources = self.config.get_pdf_sources(self.pdf_paths)
         
+        # Embedder backed by the content-addressed embedding cache
+        self.embedder = CachedOpenAIEmbedder(
+            id=self.config.EMBEDDING_MODEL,
+            dimensions=self.config.EMBEDDING_DIMENSIONS,
+            cache_dir=self.config.EMBEDDING_CACHE_DIR,
+        )
+        
         # Create PDF knowledge base
-        pdf_knowledge = PDFKnowledgeBase(
+        pdf_knowledge = ParallelPDFKnowledgeBase(
             path=pdf_sources,
-            vector_db=LanceDb(
+            vector_db=ArrowLanceDb(
                 uri=self.config.VECTOR_DB_URI,
                 table_name=self.config.VECTOR_DB_TABLE,
                 search_type=getattr(SearchType, self.config.SEARCH_TYPE.lower()),
-                embedder=OpenAIEmbedder(
-                    id=self.config.EMBEDDING_MODEL,
-                    dimensions=self.config.EMBEDDING_DIMENSIONS
-                ),
+                distance=Distance(self.config.DISTANCE),
+                embedder=self.embedder,
             ),
         )
         
-        # Create tools
-        tools = []
-        if self.config.ENABLE_REASONING:
-            tools.append(ReasoningTools(add_instructions=True))
+        # Create the agent; fast_agent answers in a single retrieve-then-answer call
+        self.agent = self._build_agent(pdf_knowledge, deep=self.deep)
+        self.fast_agent = self._build_agent(pdf_knowledge, deep=False) if self.deep else self.agent
+        
+        return self.agent
+    
+    def _build_agent(self, pdf_knowledge: PDFKnowledgeBase, deep: bool) -> Agent:
+        """Build an agent over the knowledge base
+        
+        Deep agents search the knowledge base and reason through tool calls;
+        otherwise the top passages are added to the prompt and answered in one call.
+        """
+        tools = [ReasoningTools(add_instructions=True)] if deep else []
         
-        # Create the agent
-        self.agent = Agent(
+        return Agent(
             name=self.config.AGENT_NAME,
             model=OpenAIChat(**self.config.get_model_config("openai")),
             instructions=self.config.SYSTEM_INSTRUCTIONS,
             knowledge=pdf_knowledge,
+            search_knowledge=deep,
+            add_references=not deep,
             tools=tools,
             add_datetime_to_instructions=True,
             markdown=self.config.ENABLE_MARKDOWN,
             show_tool_calls=self.config.SHOW_TOOL_CALLS,
             debug_mode=self.config.ENABLE_DEBUG,
         )
-        
-        return self.agent
     
     def load_knowledge_base(self, recreate: bool = False):
         """Load the PDF knowledge base"""
@@ -97,21 +122,79 @@ class PDFKnowledgeAgent:
             raise ValueError("Agent not created. Call create_agent() first.")
         
         print("📚 Loading PDF knowledge base...")
-        self.agent.knowledge.load(recreate=recreate)
+        
+        knowledge = self.agent.knowledge
+        if not recreate and not vector_dimensions_match(knowledge.vector_db):
+            print("   Embedding dimensions changed, recreating the knowledge table")
+            recreate = True
+        
+        if recreate:
+            knowledge.vector_db.drop()
+        
+        # Only new or changed chunks are embedded and written
+        inserted, deleted = sync_documents(
+            knowledge.vector_db, (doc for docs in knowledge.document_lists for doc in docs)
+        )
+        self.embedder.save_cache()
+        if inserted or deleted:
+            print(f"   Added {inserted} chunks, removed {deleted} stale chunks")
+        
+        # Rebuild indexes only when the table changed
+        build_search_indexes(
+            knowledge.vector_db,
+            index_type=self.config.INDEX_TYPE,
+            num_partitions=self.config.NUM_PARTITIONS,
+            num_sub_vectors=self.config.NUM_SUB_VECTORS,
+            rebuild=bool(inserted or deleted),
+        )
         print("✅ Knowledge base loaded successfully!")
     
-    def ask(self, question: str, stream: bool = None) -> str:
-        """Ask a question to the agent"""
+    def ask(self, question: str, stream: bool = None, fast_path: bool = True) -> Union[str, Iterator[str]]:
+        """Ask a question to the agent
+        
+        With fast_path the retrieved passages are inlined into a single LLM call
+        instead of going through the tool loop of the deep agent. When streaming,
+        returns an iterator over the response text as it is generated.
+        """
         if not self.agent:
             raise ValueError("Agent not created. Call create_agent() first.")
         
         if stream is None:
             stream = self.config.STREAM_RESPONSES
         
-        response = self.agent.run(question)
+        agent = self.fast_agent if fast_path else self.agent
+        if stream:
+            return (chunk.content for chunk in agent.run(question, stream=True) if chunk.content)
+        response = agent.run(question)
         return response.content
     
-    def chat_interactive(self):
+    async def ask_stream(self, question: str, fast_path: bool = True) -> AsyncIterator[str]:
+        """Yield the response text as it is generated (async)"""
+        if not self.agent:
+            raise ValueError("Agent not created. Call create_agent() first.")
+        
+        agent = self.fast_agent if fast_path else self.agent
+        async for chunk in await agent.arun(question, stream=True):
+            if chunk.content:
+                yield chunk.content
+    
+    async def ask_many(self, questions: List[str], fast_path: bool = True) -> List[str]:
+        """Answer several questions concurrently, at most MAX_CONCURRENT_REQUESTS at a time"""
+        if not self.agent:
+            raise ValueError("Agent not created. Call create_agent() first.")
+        
+        agent = self.fast_agent if fast_path else self.agent
+        semaphore = asyncio.Semaphore(self.config.MAX_CONCURRENT_REQUESTS)
+        
+        async def answer(question: str) -> str:
+            async with semaphore:
+                # Each question runs on its own copy so concurrent runs don't share run state
+                response = await agent.deep_copy().arun(question)
+            return response.content
+        
+        return await asyncio.gather(*(answer(question) for question in questions))
+    
+    async def chat_interactive(self):
         """Start an interactive chat session"""
         if not self.agent:
             raise ValueError("Agent not created. Call create_agent() first.")
@@ -121,6 +204,9 @@ class PDFKnowledgeAgent:
         print("📝 Type 'help' for commands, 'quit' to exit")
         print("=" * 50)
         
+        # Warm up while the user types the first question
+        threading.Thread(target=self._warm_up, daemon=True).start()
+        
         while True:
             try:
                 user_input = input("\n🤔 Your question: ").strip()
@@ -143,7 +229,7 @@ class PDFKnowledgeAgent:
                 print("\n🤖 Thinking...")
                 print("-" * 40)
                 
-                self.agent.print_response(
+                await self.agent.aprint_response(
                     user_input,
                     stream=self.config.STREAM_RESPONSES,
                     show_full_reasoning=self.config.ENABLE_DEBUG,
@@ -160,6 +246,14 @@ class PDFKnowledgeAgent:
                     import traceback
                     traceback.print_exc()
     
+    def _warm_up(self):
+        """Open the table, load its index and connect to OpenAI ahead of the first query"""
+        try:
+            self.agent.knowledge.search(query=self.config.AGENT_NAME, num_documents=1)
+        except Exception as e:
+            if self.config.ENABLE_DEBUG:
+                print(f"⚠️  Warm-up failed: {e}")
+    
     def _show_help(self):
         """Show help information"""
         print("\n📋 Available commands:")
@@ -180,6 +274,13 @@ class PDFKnowledgeAgent:
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="PDF Knowledge Base Agent")
+    parser.add_argument("--deep", action="store_true",
+                        help="Use tool-based knowledge search with reasoning tools (slower)")
+    parser.add_argument("--questions", metavar="FILE",
+                        help="Answer the questions in FILE (one per line) concurrently instead of chatting")
+    args = parser.parse_args()
+    
     print("🚀 PDF Knowledge Base Agent with Agno")
     print("=" * 40)
     
@@ -189,15 +290,25 @@ def main():
     
     try:
         # Create agent
-        agent_manager = PDFKnowledgeAgent(pdf_paths=pdf_paths)
+        agent_manager = PDFKnowledgeAgent(pdf_paths=pdf_paths, deep=args.deep)
         agent = agent_manager.create_agent()
         
         # Load knowledge base
         agent_manager.load_knowledge_base(recreate=False)
         
-        # Start interactive chat
-        agent_manager.chat_interactive()
+        if args.questions:
+            questions = [line.strip() for line in Path(args.questions).read_text().splitlines() if line.strip()]
+            answers = asyncio.run(agent_manager.ask_many(questions))
+            for question, answer in zip(questions, answers):
+                print(f"\n🤔 {question}")
+                print("-" * 40)
+                print(answer)
+        else:
+            # Start interactive chat
+            asyncio.run(agent_manager.chat_interactive())
         
+    except KeyboardInterrupt:
+        print("\n👋 Goodbye!")
     except Exception as e:
         print(f"❌ Failed to start agent: {e}")
         sys.exit(1)
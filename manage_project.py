@@ -9,9 +9,12 @@ This script helps manage the organized project structure including:
 - Deployment operations
 """
 
+import os
 import sys
+import shlex
 import subprocess
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # Project root directory
@@ -22,11 +25,10 @@ CONFIG_DIR = PROJECT_ROOT / "config"
 LOGS_DIR = PROJECT_ROOT / "logs"
 
 def run_command(cmd, cwd=None, check=True):
-    """Run a command with error handling"""
+    """Run a command, given as an argument list, with error handling"""
     try:
         result = subprocess.run(
-            cmd, 
-            shell=True, 
+            [str(arg) for arg in cmd],
             cwd=cwd or PROJECT_ROOT,
             capture_output=True,
             text=True,
@@ -34,7 +36,7 @@ def run_command(cmd, cwd=None, check=True):
         )
         return result.stdout, result.stderr, result.returncode
     except subprocess.CalledProcessError as e:
-        print(f"❌ Command failed: {cmd}")
+        print(f"❌ Command failed: {shlex.join(str(arg) for arg in cmd)}")
         print(f"Error: {e.stderr}")
         return None, e.stderr, e.returncode
 
@@ -46,7 +48,7 @@ def install_dependencies(component=None):
         req_file = CONFIG_DIR / f"{component}_requirements.txt"
         if req_file.exists():
             print(f"Installing dependencies for {component}...")
-            _, stderr, code = run_command(f"pip install -r {req_file}")
+            _, stderr, code = run_command([sys.executable, "-m", "pip", "install", "-r", req_file])
             if code == 0:
                 print(f"✅ {component} dependencies installed successfully")
             else:
@@ -56,10 +58,25 @@ def install_dependencies(component=None):
         else:
             print(f"❌ Requirements file not found: {req_file}")
     else:
-        # Install all requirements
-        for req_file in CONFIG_DIR.glob("*requirements.txt"):
+        # Install all requirements with one resolver run over their union
+        req_files = sorted(CONFIG_DIR.glob("*requirements.txt"))
+        if not req_files:
+            print("❌ No requirements files found")
+            return
+        print(f"Installing dependencies from {', '.join(f.name for f in req_files)}...")
+        cmd = [sys.executable, "-m", "pip", "install"]
+        for req_file in req_files:
+            cmd += ["-r", req_file]
+        _, stderr, code = run_command(cmd)
+        if code == 0:
+            print("✅ All dependencies installed successfully")
+            return
+        
+        # Fall back to one file at a time to show which one fails
+        print("⚠️  Combined install failed, retrying each requirements file...")
+        for req_file in req_files:
             print(f"Installing dependencies from {req_file.name}...")
-            _, stderr, code = run_command(f"pip install -r {req_file}")
+            _, stderr, code = run_command([sys.executable, "-m", "pip", "install", "-r", req_file])
             if code == 0:
                 print(f"✅ {req_file.name} installed successfully")
             else:
@@ -75,7 +92,7 @@ def run_tests(component=None):
         test_file = TESTS_DIR / f"test_{component}.py"
         if test_file.exists():
             print(f"Running tests for {component}...")
-            _, stderr, code = run_command(f"python {test_file}")
+            _, stderr, code = run_command([sys.executable, test_file])
             if code == 0:
                 print(f"✅ {component} tests passed")
             else:
@@ -85,18 +102,24 @@ def run_tests(component=None):
         else:
             print(f"❌ Test file not found: {test_file}")
     else:
-        # Run all tests
+        # Run all test scripts concurrently; each is its own interpreter, so threads suffice
         test_files = list(TESTS_DIR.glob("test_*.py"))
         if test_files:
-            for test_file in test_files:
-                print(f"Running {test_file.name}...")
-                _, stderr, code = run_command(f"python {test_file}")
-                if code == 0:
-                    print(f"✅ {test_file.name} passed")
-                else:
-                    print(f"❌ {test_file.name} failed")
-                    if stderr:
-                        print(f"Error: {stderr}")
+            print(f"Running {len(test_files)} test files...")
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                futures = {
+                    executor.submit(run_command, [sys.executable, test_file], None, False): test_file
+                    for test_file in test_files
+                }
+                for future in as_completed(futures):
+                    test_file = futures[future]
+                    _, stderr, code = future.result()
+                    if code == 0:
+                        print(f"✅ {test_file.name} passed")
+                    else:
+                        print(f"❌ {test_file.name} failed")
+                        if stderr:
+                            print(f"Error: {stderr}")
         else:
             print("❌ No test files found")
 
@@ -115,11 +138,11 @@ def start_service(service):
         service_file = service_map[service]
         if service_file.exists():
             print(f"Starting {service} service...")
-            print(f"Command: python {service_file}")
+            print(f"Command: {sys.executable} {service_file}")
             print("Press Ctrl+C to stop...")
             
             try:
-                subprocess.run(f"python {service_file}", shell=True, cwd=PROJECT_ROOT, check=False)
+                subprocess.run([sys.executable, str(service_file)], cwd=PROJECT_ROOT, check=False)
             except KeyboardInterrupt:
                 print(f"\n🛑 {service} service stopped")
         else:
@@ -194,7 +217,11 @@ def show_status():
     
     # Check configuration
     print("\n📋 Configuration Files:")
-    config_files = list(CONFIG_DIR.glob("*.py")) + list(CONFIG_DIR.glob("*.txt"))
+    # One directory scan for both kinds of config file
+    config_files = sorted(
+        (f for f in CONFIG_DIR.iterdir() if f.suffix in (".py", ".txt") and f.is_file()),
+        key=lambda f: (f.suffix != ".py", f.name)
+    )
     for config_file in config_files:
         print(f"  ✅ {config_file.name}")
     
@@ -7,8 +7,9 @@ This script helps you set up and configure the Email PDF Agent.
 
 import os
 import sys
+import importlib.util
 from pathlib import Path
-from email_config import EmailPDFConfig, ENV_TEMPLATE
+from email_config import CONFIG, ENV_TEMPLATE
 
 def create_env_file():
     """Create a .env template file"""
@@ -22,8 +23,7 @@ def create_env_file():
     
     print("📝 Creating .env template file...")
     
-    with open(env_path, 'w') as f:
-        f.write(ENV_TEMPLATE)
+    env_path.write_text(ENV_TEMPLATE, encoding='utf-8')
     
     print(f"✅ Created {env_path}")
     print("📋 Please edit this file with your actual configuration values")
@@ -41,11 +41,11 @@ def check_dependencies():
     
     missing_packages = []
     
+    # Locate each package without importing (and so running) it
     for package in required_packages:
-        try:
-            __import__(package)
+        if importlib.util.find_spec(package) is not None:
             print(f"✅ {package}")
-        except ImportError:
+        else:
             print(f"❌ {package}")
             missing_packages.append(package)
     
@@ -61,7 +61,7 @@ def validate_configuration():
     """Validate the current configuration"""
     print("\n🔧 Validating configuration...")
     
-    missing = EmailPDFConfig.validate_config()
+    missing = CONFIG.validate_config()
     
     if missing:
         print("❌ Missing required configuration:")
@@ -33,8 +33,8 @@ def check_python_version():
     print(f"✅ Python {sys.version} - Compatible!")
     return True
 
-def install_dependencies():
-    """Install required Python packages"""
+def start_dependency_install():
+    """Start installing the required Python packages in the background"""
     print("\n📦 Installing required packages...")
     
     packages = [
@@ -46,19 +46,29 @@ def install_dependencies():
         "reportlab"  # For testing
     ]
     
-    try:
-        for package in packages:
-            print(f"   Installing {package}...")
-            subprocess.run([sys.executable, "-m", "pip", "install", package], 
-                         check=True, capture_output=True)
-        
+    # One pip run resolves and downloads all packages together
+    print(f"   Installing {', '.join(packages)}...")
+    # Wheels over source builds (reportlab has C extensions); output is captured,
+    # so no progress bar
+    return subprocess.Popen([sys.executable, "-m", "pip", "install",
+                             "--disable-pip-version-check", "--no-input",
+                             "--prefer-binary", "--progress-bar", "off", *packages],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+def install_dependencies(process=None):
+    """Install required Python packages, or wait for an install already started"""
+    process = process or start_dependency_install()
+    _, stderr = process.communicate()
+    
+    if process.returncode == 0:
         print("✅ All packages installed successfully!")
         return True
-        
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error installing packages: {e}")
-        print("Try running: pip install -r legal_requirements.txt")
-        return False
+    
+    print(f"❌ Error installing packages (pip exited with {process.returncode})")
+    if stderr:
+        print(stderr.strip())
+    print("Try running: pip install -r legal_requirements.txt")
+    return False
 
 def create_env_file():
     """Create environment configuration file"""
@@ -107,8 +117,7 @@ MAX_PDF_SIZE=20971520
             print("📄 Keeping existing .env file")
             return True
     
-    with open(env_path, 'w') as f:
-        f.write(env_template)
+    env_path.write_text(env_template, encoding='utf-8')
     
     print("✅ Created .env configuration file")
     print("📝 Please edit .env and fill in your actual values:")
@@ -166,8 +175,7 @@ def show_next_steps():
         "   • For help: python legal_case_system.py --help-detailed",
     ]
     
-    for step in steps:
-        print(step)
+    print("\n".join(steps))
 
 def main():
     """Main setup function"""
@@ -177,16 +185,21 @@ def main():
     if not check_python_version():
         return
     
-    # Step 2: Install dependencies
-    if not install_dependencies():
+    # Step 2: Install dependencies, in the background while the configuration is written
+    install = start_dependency_install()
+    
+    # Step 3: Create configuration
+    env_created = create_env_file()
+    
+    print("\n⏳ Waiting for package installation to finish...")
+    if not install_dependencies(install):
         print("\n⚠️  Dependency installation failed.")
         print("You can try manually: pip install -r legal_requirements.txt")
         response = input("Continue setup anyway? (y/N): ")
         if response.lower() not in ['y', 'yes']:
             return
     
-    # Step 3: Create configuration
-    if not create_env_file():
+    if not env_created:
         return
     
     # Step 4: Run demo (optional)
@@ -4,6 +4,7 @@ Advanced PDF Knowledge Base Agent with Multiple PDFs and Custom Features
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from agno.agent import Agent
 from agno.knowledge.pdf import PDFKnowledgeBase
@@ -11,9 +12,19 @@ from agno.models.openai import OpenAIChat
 from agno.embedder.openai import OpenAIEmbedder
 from agno.vectordb.lancedb import LanceDb, SearchType
 from agno.tools.reasoning import ReasoningTools
+from knowledge_store import knowledge_is_current, save_knowledge_stamp
 
-def create_advanced_pdf_agent():
-    """Create an advanced PDF agent with multiple documents and custom features"""
+# Vector table of the knowledge base, and the record of which PDFs filled it
+KNOWLEDGE_DB_URI = "tmp/advanced_pdf_lancedb"
+KNOWLEDGE_STAMP_PATH = f"{KNOWLEDGE_DB_URI}.stamp.json"
+
+@lru_cache(maxsize=1)
+def create_pdf_knowledge() -> PDFKnowledgeBase:
+    """Create the PDF knowledge base, once per process
+    
+    Agents share it, so the LanceDB table and the embedder's OpenAI client
+    are opened a single time.
+    """
     
     # Example of using multiple PDFs with metadata
     pdf_sources = [
@@ -34,10 +45,10 @@ def create_advanced_pdf_agent():
     ]
     
     # Create PDF knowledge base with multiple sources
-    pdf_knowledge = PDFKnowledgeBase(
+    return PDFKnowledgeBase(
         path=pdf_sources,  # List of dictionaries with path and metadata
         vector_db=LanceDb(
-            uri="tmp/advanced_pdf_lancedb",
+            uri=KNOWLEDGE_DB_URI,
             table_name="advanced_pdf_knowledge",
             search_type=SearchType.hybrid,
             embedder=OpenAIEmbedder(
@@ -46,6 +57,20 @@ def create_advanced_pdf_agent():
             ),
         ),
     )
+
+def load_pdf_knowledge(knowledge: PDFKnowledgeBase):
+    """Load the knowledge base, unless the table already holds the current PDFs"""
+    paths = [source["path"] for source in knowledge.path]
+    if knowledge_is_current(knowledge.vector_db, paths, KNOWLEDGE_STAMP_PATH):
+        print("📚 Knowledge base is up to date")
+        return
+    
+    print("📚 Loading PDF knowledge base with metadata...")
+    knowledge.load(recreate=False)
+    save_knowledge_stamp(paths, KNOWLEDGE_STAMP_PATH)
+
+def create_advanced_pdf_agent():
+    """Create an advanced PDF agent with multiple documents and custom features"""
     
     # Create the agent with enhanced instructions
     agent = Agent(
@@ -61,7 +86,7 @@ def create_advanced_pdf_agent():
             "If asked about the knowledge base itself, describe what documents you have access to.",
             "Be precise about what you know and don't know based on your knowledge base.",
         ],
-        knowledge=pdf_knowledge,
+        knowledge=create_pdf_knowledge(),
         tools=[ReasoningTools(add_instructions=True)],
         add_datetime_to_instructions=True,
         markdown=True,
@@ -82,8 +107,7 @@ def demonstrate_advanced_features():
     
     agent = create_advanced_pdf_agent()
     
-    print("📚 Loading PDF knowledge base with metadata...")
-    agent.knowledge.load(recreate=False)
+    load_pdf_knowledge(agent.knowledge)
     
     print("✅ Advanced Agent ready!\n")
     
@@ -123,8 +147,7 @@ def interactive_advanced_chat():
     
     agent = create_advanced_pdf_agent()
     
-    print("📚 Loading knowledge base...")
-    agent.knowledge.load(recreate=False)
+    load_pdf_knowledge(agent.knowledge)
     
     print("✅ Ready for advanced interactions!")
     print("\n🎯 Special commands:")
@@ -4,24 +4,28 @@ Configuration file for PDF Knowledge Base Agent
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 
 class PDFAgentConfig:
     """Configuration class for PDF Agent"""
     
-    # API Keys
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-    
     # Model Configuration
     DEFAULT_MODEL = "gpt-4o-mini"  # Cost-effective choice
     EMBEDDING_MODEL = "text-embedding-3-small"
-    EMBEDDING_DIMENSIONS = 1536
+    EMBEDDING_DIMENSIONS = 512  # text-embedding-3 supports shortened embeddings
+    EMBEDDING_CACHE_DIR = "tmp/embedding_cache"  # Content-addressed embedding cache
     
     # Vector Database Configuration
     VECTOR_DB_URI = "tmp/pdf_lancedb"
     VECTOR_DB_TABLE = "pdf_knowledge"
-    SEARCH_TYPE = "hybrid"  # Options: "vector", "text", "hybrid"
+    SEARCH_TYPE = "hybrid"  # Options: "vector", "keyword", "hybrid"
+    DISTANCE = "max_inner_product"  # Embeddings are unit-normalized, so dot product ranks like cosine
+    
+    # ANN Index Configuration
+    INDEX_TYPE = "IVF_HNSW_SQ"  # Options: "IVF_PQ", "IVF_HNSW_SQ" (int8 scalar quantization)
+    NUM_PARTITIONS = None  # None = sqrt(number of rows)
+    NUM_SUB_VECTORS = 64  # IVF_PQ only, must divide EMBEDDING_DIMENSIONS
     
     # PDF Configuration
     DEFAULT_PDF_PATH = "knowledge_base.pdf"
@@ -31,6 +35,8 @@ class PDFAgentConfig:
     AGENT_NAME = "PDF Knowledge Assistant"
     MAX_TOKENS = 4000
     TEMPERATURE = 0.1  # Lower for more consistent responses
+    MAX_CONCURRENT_REQUESTS = 20  # LLM calls in flight when answering several questions
+    MAX_RETRIES = 5  # Retries with exponential backoff on 429/5xx responses
     
     # Instructions
     SYSTEM_INSTRUCTIONS = [
@@ -43,7 +49,7 @@ class PDFAgentConfig:
     ]
     
     # Features
-    ENABLE_REASONING = True
+    ENABLE_REASONING = False  # Reasoning tools add LLM round-trips; enable with --deep
     ENABLE_DEBUG = False
     ENABLE_MARKDOWN = True
     SHOW_TOOL_CALLS = True
@@ -54,18 +60,35 @@ class PDFAgentConfig:
     PDF_DIRECTORY = PROJECT_ROOT / "pdfs"
     VECTOR_DB_PATH = PROJECT_ROOT / "tmp" / "pdf_lancedb"
     
+    # API Keys are read when needed, so a .env loaded after import is picked up
+    @staticmethod
+    def openai_api_key():
+        return os.getenv("OPENAI_API_KEY")
+    
+    @staticmethod
+    def anthropic_api_key():
+        return os.getenv("ANTHROPIC_API_KEY")
+    
     @classmethod
     def validate_config(cls):
         """Validate the configuration"""
+        # Fresh list each call, callers append their own errors to it
+        return list(cls._check_config(bool(cls.openai_api_key()), cls.DEFAULT_PDF_PATH))
+    
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _check_config(has_api_key, pdf_path):
+        """Cached checks, keyed by the inputs so a changed key or path is rechecked.
+        Call PDFAgentConfig._check_config.cache_clear() after creating the PDF."""
         errors = []
         
-        if not cls.OPENAI_API_KEY:
+        if not has_api_key:
             errors.append("OPENAI_API_KEY is not set")
         
-        if not Path(cls.DEFAULT_PDF_PATH).exists():
-            errors.append(f"Default PDF file not found: {cls.DEFAULT_PDF_PATH}")
+        if not Path(pdf_path).exists():
+            errors.append(f"Default PDF file not found: {pdf_path}")
         
-        return errors
+        return tuple(errors)
     
     @classmethod
     def get_pdf_sources(cls, pdf_paths=None):
@@ -97,6 +120,7 @@ class PDFAgentConfig:
                 "id": cls.DEFAULT_MODEL,
                 "max_tokens": cls.MAX_TOKENS,
                 "temperature": cls.TEMPERATURE,
+                "max_retries": cls.MAX_RETRIES,
             }
         elif model_type == "anthropic":
             return {
@@ -126,4 +150,4 @@ if __name__ == "__main__":
     print(f"   Embedding: {PDFAgentConfig.EMBEDDING_MODEL}")
     print(f"   Vector DB: {PDFAgentConfig.VECTOR_DB_URI}")
     print(f"   Default PDF: {PDFAgentConfig.DEFAULT_PDF_PATH}")
-    print(f"   API Key set: {'Yes' if PDFAgentConfig.OPENAI_API_KEY else 'No'}")
+    print(f"   API Key set: {'Yes' if PDFAgentConfig.openai_api_key() else 'No'}")
@@ -63,11 +63,16 @@ def create_sample_pdf():
          "AI is rapidly evolving and becoming an integral part of our daily lives. Understanding its capabilities and limitations is crucial for leveraging its benefits while addressing potential challenges.")
     ]
     
-    for title, content in sections:
-        story.append(Paragraph(title, styles['Heading2']))
-        story.append(Spacer(1, 12))
-        story.append(Paragraph(content, styles['Normal']))
-        story.append(Spacer(1, 12))
+    heading_style = styles['Heading2']
+    body_style = styles['Normal']
+    story.extend(
+        flowable
+        for title, content in sections
+        for flowable in (
+            Paragraph(title, heading_style), Spacer(1, 12),
+            Paragraph(content, body_style), Spacer(1, 12),
+        )
+    )
     
     # Build PDF
     doc.build(story)
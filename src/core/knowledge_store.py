@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""
+Knowledge store helpers for the PDF Knowledge Base Agent
+
+Batched, cached embeddings and search index maintenance for the
+LanceDB-backed PDF knowledge bases.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import httpx
+import numpy as np
+from agno.document import Document
+from agno.document.reader.pdf_reader import PDFImageReader, PDFReader
+from agno.embedder.openai import OpenAIEmbedder
+from agno.knowledge.pdf import PDFKnowledgeBase
+from agno.vectordb.distance import Distance
+from agno.vectordb.lancedb import LanceDb
+from openai import AsyncOpenAI
+from pydantic import PrivateAttr
+
+try:
+    import orjson
+except ImportError:
+    # Optional: faster manifest (de)serialization
+    orjson = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    # Optional: PDFium text extraction, otherwise pypdf
+    pdfium = None
+
+logger = logging.getLogger(__name__)
+
+# The embeddings API accepts up to 2048 inputs per request
+EMBEDDING_BATCH_SIZE = 128
+EMBEDDING_CONCURRENCY = 8
+
+# Recent query embeddings kept in memory (queries are not written to disk)
+QUERY_CACHE_SIZE = 256
+
+# PQ training needs at least 256 rows; below that a flat scan is fast anyway
+INDEX_MIN_ROWS = 256
+
+# Lance names of agno's distance metrics
+LANCE_DISTANCE = {
+    Distance.cosine: "cosine",
+    Distance.l2: "l2",
+    Distance.max_inner_product: "dot",
+}
+
+
+@dataclass
+class CachedOpenAIEmbedder(OpenAIEmbedder):
+    """OpenAIEmbedder with an on-disk cache and batched prefetching
+
+    The cache lives in ``cache_dir`` as ``vectors.npy`` (float32 rows) plus
+    ``manifest.json`` (row order of the content hashes), keyed by the SHA-256
+    of the whitespace-normalized chunk text.
+    """
+
+    cache_dir: Optional[str] = None
+    batch_size: int = EMBEDDING_BATCH_SIZE
+    max_concurrency: int = EMBEDDING_CONCURRENCY
+
+    def __post_init__(self):
+        self._cache: Dict[str, np.ndarray] = self._load_cache()
+        self._dirty = False
+        self._query_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def _cache_key(self, text: str) -> str:
+        """Content hash of a chunk (model and dimensions included)"""
+        normalized = " ".join(text.split())
+        return hashlib.sha256(f"{self.id}:{self.dimensions}:{normalized}".encode()).hexdigest()
+
+    def _cache_files(self) -> Tuple[Path, Path]:
+        cache_dir = Path(self.cache_dir)
+        return cache_dir / "manifest.json", cache_dir / "vectors.npy"
+
+    def _load_cache(self) -> Dict[str, np.ndarray]:
+        """Load cached embeddings from disk (vectors are memory-mapped)"""
+        if not self.cache_dir:
+            return {}
+        manifest_path, vectors_path = self._cache_files()
+        if not (manifest_path.exists() and vectors_path.exists()):
+            return {}
+        manifest = manifest_path.read_bytes()
+        keys = orjson.loads(manifest) if orjson else json.loads(manifest)
+        vectors = np.load(vectors_path, mmap_mode='r')
+        return dict(zip(keys, vectors))
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        """Scale to unit length so dot product equals cosine similarity"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _store(self, key: str, embedding: List[float]) -> np.ndarray:
+        vector = self._cache[key] = self._normalize(embedding)
+        self._dirty = True
+        return vector
+
+    def save_cache(self):
+        """Write cached embeddings to disk if anything new was embedded"""
+        if not self.cache_dir or not self._dirty:
+            return
+        manifest_path, vectors_path = self._cache_files()
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+
+        keys = list(self._cache)
+        vectors = np.stack([self._cache[key] for key in keys]).astype(np.float32, copy=False)
+
+        # Write to temporary files first; the old vectors file may still be mapped
+        tmp_vectors = vectors_path.with_suffix(".tmp.npy")
+        np.save(tmp_vectors, vectors)
+        tmp_manifest = manifest_path.with_suffix(".tmp")
+        tmp_manifest.write_bytes(orjson.dumps(keys) if orjson else json.dumps(keys).encode())
+        os.replace(tmp_vectors, vectors_path)
+        os.replace(tmp_manifest, manifest_path)
+
+        self._cache = dict(zip(keys, np.load(vectors_path, mmap_mode='r')))
+        self._dirty = False
+
+    def get_embedding(self, text: str) -> List[float]:
+        # Used by LanceDb for search queries; repeated queries skip the API
+        if text in self._query_cache:
+            self._query_cache.move_to_end(text)
+            return self._query_cache[text]
+
+        key = self._cache_key(text)
+        if key in self._cache:
+            embedding = self._cache[key].tolist()
+        else:
+            embedding = super().get_embedding(text)
+            if not embedding:
+                return embedding
+            embedding = self._normalize(embedding).tolist()
+
+        self._query_cache[text] = embedding
+        if len(self._query_cache) > QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        return embedding
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        key = self._cache_key(text)
+        if key in self._cache:
+            return self._cache[key].tolist(), None
+        embedding, usage = super().get_embedding_and_usage(text)
+        if not embedding:
+            return embedding, usage
+        return self._store(key, embedding).tolist(), usage
+
+    def prefetch(self, texts: Iterable[str]) -> int:
+        """Embed all uncached texts in batched requests and persist the cache.
+
+        Returns the number of texts that had to be embedded.
+        """
+        missing = {}
+        for text in texts:
+            key = self._cache_key(text)
+            if key not in self._cache:
+                missing[key] = text
+        if not missing:
+            return 0
+
+        keys = list(missing)
+        batches = [keys[i:i + self.batch_size] for i in range(0, len(keys), self.batch_size)]
+        results = asyncio.run(self._embed_batches([[missing[k] for k in batch] for batch in batches]))
+
+        for batch, embeddings in zip(batches, results):
+            for key, embedding in zip(batch, embeddings):
+                self._store(key, embedding)
+        self.save_cache()
+        return len(keys)
+
+    async def _embed_batches(self, batches: List[List[str]]) -> List[List[List[float]]]:
+        """Send one embeddings request per batch, at most max_concurrency at a time"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        client = AsyncOpenAI(**self._async_client_params())
+
+        async def embed(batch: List[str]) -> List[List[float]]:
+            request_params: Dict[str, Any] = {
+                "input": batch,
+                "model": self.id,
+                "encoding_format": self.encoding_format,
+            }
+            if self.user is not None:
+                request_params["user"] = self.user
+            if self.id.startswith("text-embedding-3"):
+                request_params["dimensions"] = self.dimensions
+            if self.request_params:
+                request_params.update(self.request_params)
+
+            async with semaphore:
+                response = await client.embeddings.create(**request_params)
+            # Results are not guaranteed to come back in input order
+            return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+        try:
+            return await asyncio.gather(*(embed(batch) for batch in batches))
+        finally:
+            await client.close()
+
+    def _async_client_params(self) -> Dict[str, Any]:
+        """Client parameters matching the synchronous OpenAI client"""
+        params: Dict[str, Any] = {
+            "api_key": self.api_key,
+            "organization": self.organization,
+            "base_url": self.base_url,
+        }
+        params = {k: v for k, v in params.items() if v is not None}
+        if self.client_params:
+            params.update(self.client_params)
+        # A shared synchronous httpx client cannot back the async client
+        if not isinstance(params.get("http_client"), httpx.AsyncClient):
+            params.pop("http_client", None)
+        return params
+
+
+class PdfiumPDFReader(PDFReader):
+    """PDFReader that extracts page text with PDFium (pypdfium2) instead of pypdf
+
+    Falls back to the pypdf reader when pypdfium2 is not installed.
+    """
+
+    def read(self, pdf: Union[str, Path, IO[Any]]) -> List[Document]:
+        if pdfium is None:
+            return super().read(pdf)
+
+        # Same document names as PDFReader
+        try:
+            if isinstance(pdf, str):
+                doc_name = pdf.split("/")[-1].split(".")[0].replace(" ", "_")
+            else:
+                doc_name = pdf.name.split(".")[0]
+        except Exception:
+            doc_name = "pdf"
+
+        pages = []
+        pdf_document = pdfium.PdfDocument(pdf)
+        try:
+            for page_number, page in enumerate(pdf_document, start=1):
+                text_page = page.get_textpage()
+                pages.append(Document(
+                    name=doc_name,
+                    id=f"{doc_name}_{page_number}",
+                    meta_data={"page": page_number},
+                    # PDFium separates lines with CRLF
+                    content=text_page.get_text_range().replace("\r\n", "\n"),
+                ))
+                text_page.close()
+                page.close()
+        finally:
+            pdf_document.close()
+
+        if self.chunk:
+            return [chunk for page in pages for chunk in self.chunk_document(page)]
+        return pages
+
+
+def _read_pdf(reader: PDFReader, source: Tuple[Path, Dict[str, Any]]) -> List[Document]:
+    """Read one PDF into documents (runs in a worker process)"""
+    path, metadata = source
+    documents = reader.read(pdf=path)
+    for document in documents:
+        document.meta_data.update(metadata)
+    return documents
+
+
+class ParallelPDFKnowledgeBase(PDFKnowledgeBase):
+    """PDFKnowledgeBase that reads its PDFs in parallel worker processes
+
+    Documents are read once per instance, so prefetching embeddings and
+    loading the table do not parse the PDFs twice.
+    """
+
+    reader: Union[PDFReader, PDFImageReader] = PdfiumPDFReader()
+    max_workers: Optional[int] = None
+    _documents: Optional[List[List[Document]]] = PrivateAttr(default=None)
+
+    def _pdf_sources(self) -> List[Tuple[Path, Dict[str, Any]]]:
+        """One (path, metadata) entry per PDF file"""
+        items = self.path if isinstance(self.path, list) else [self.path]
+        sources = []
+        for item in items:
+            metadata = item.get("metadata", {}) if isinstance(item, dict) else {}
+            path = Path(item["path"] if isinstance(item, dict) else item)
+            if path.is_dir():
+                sources.extend(
+                    (pdf, metadata) for pdf in sorted(path.glob("**/*.pdf"))
+                    if pdf.name not in self.exclude_files
+                )
+            elif path.is_file() and path.suffix == ".pdf":
+                sources.append((path, metadata))
+        return sources
+
+    @property
+    def document_lists(self) -> Iterator[List[Document]]:
+        if self._documents is None:
+            sources = self._pdf_sources()
+            read = partial(_read_pdf, self.reader)
+            if len(sources) > 1 and (self.max_workers or os.cpu_count() or 1) > 1:
+                with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                    self._documents = list(executor.map(read, sources))
+            else:
+                self._documents = [read(source) for source in sources]
+        return iter(self._documents)
+
+
+class ArrowLanceDb(LanceDb):
+    """LanceDb that reads search results straight from Arrow
+
+    Queries run on the table handle opened at construction and fetch only the
+    payload column of the top rows; no DataFrame is built and the vectors are
+    never copied out of the table.
+    """
+
+    def vector_search(self, query: str, limit: int = 5) -> List[Document]:
+        if self.table is None:
+            return []
+        embedding = self.embedder.get_embedding(query)
+        if not embedding:
+            logger.error(f"Error getting embedding for Query: {query}")
+            return []
+        builder = self.table.search(embedding, vector_column_name=self._vector_col)
+        return self._search(query, builder.distance_type(LANCE_DISTANCE[self.distance]), limit)
+
+    def hybrid_search(self, query: str, limit: int = 5) -> List[Document]:
+        if self.table is None:
+            return []
+        embedding = self.embedder.get_embedding(query)
+        if not embedding:
+            logger.error(f"Error getting embedding for Query: {query}")
+            return []
+        self._ensure_fts_index()
+        builder = self.table.search(query_type="hybrid", vector_column_name=self._vector_col)
+        builder = builder.vector(embedding).text(query).distance_type(LANCE_DISTANCE[self.distance])
+        return self._search(query, builder, limit)
+
+    def keyword_search(self, query: str, limit: int = 5) -> List[Document]:
+        if self.table is None:
+            return []
+        self._ensure_fts_index()
+        return self._search(query, self.table.search(query, query_type="fts"), limit)
+
+    def _ensure_fts_index(self):
+        if not self.fts_index_exists:
+            self.table.create_fts_index("payload", use_tantivy=self.use_tantivy, replace=True)
+            self.fts_index_exists = True
+
+    def _search(self, query: str, builder, limit: int) -> List[Document]:
+        if getattr(self, "nprobes", None) and hasattr(builder, "nprobes"):
+            builder = builder.nprobes(self.nprobes)
+        results = builder.select(["payload"]).limit(limit).to_arrow()
+
+        documents = []
+        for payload in results.column("payload").to_pylist():
+            payload = json.loads(payload)
+            documents.append(Document(
+                name=payload["name"],
+                meta_data=payload["meta_data"],
+                content=payload["content"],
+                embedder=self.embedder,
+                usage=payload.get("usage"),
+            ))
+        if self.reranker:
+            documents = self.reranker.rerank(query=query, documents=documents)
+        return documents
+
+
+def _document_id(document: Document) -> str:
+    """Row id LanceDb.insert() gives a document (hash of its content)"""
+    return hashlib.md5(document.content.replace("\x00", "\ufffd").encode()).hexdigest()
+
+
+def sync_documents(vector_db, documents: Iterable[Document]) -> Tuple[int, int]:
+    """Make the table hold exactly the given chunks, touching only the ones that changed.
+
+    Rows are keyed by content hash: unchanged chunks are neither re-embedded
+    nor rewritten, new chunks are embedded in batches and inserted, and rows
+    whose chunk no longer exists are deleted. Returns (inserted, deleted).
+    """
+    if not vector_db.exists():
+        vector_db.create()
+    table = vector_db.table
+    id_col = getattr(vector_db, "_id", "id")
+
+    wanted: Dict[str, Document] = {}
+    for document in documents:
+        wanted.setdefault(_document_id(document), document)
+
+    # One scan of the id column instead of an existence query per chunk
+    n_rows = table.count_rows()
+    existing = set()
+    if n_rows:
+        ids = table.search().select([id_col]).limit(n_rows).to_arrow()
+        existing = set(ids.column(id_col).to_pylist())
+
+    new_documents = [document for doc_id, document in wanted.items() if doc_id not in existing]
+    if new_documents:
+        if hasattr(vector_db.embedder, "prefetch"):
+            vector_db.embedder.prefetch(document.content for document in new_documents)
+        vector_db.insert(new_documents)
+
+    stale = existing - wanted.keys()
+    if stale:
+        table.delete(f"{id_col} IN ({', '.join(repr(doc_id) for doc_id in stale)})")
+    return len(new_documents), len(stale)
+
+
+def vector_dimensions_match(vector_db) -> bool:
+    """Whether the table's vector column fits the embedder's dimensions"""
+    table = vector_db.table
+    if table is None:
+        return True
+    vector_type = table.schema.field(vector_db._vector_col).type
+    return getattr(vector_type, "list_size", vector_db.dimensions) == vector_db.dimensions
+
+
+def _source_stamp(paths: Iterable[Union[str, Path]]) -> Dict[str, List[int]]:
+    """Modification time and size of each source file, keyed by absolute path"""
+    stamp = {}
+    for path in paths:
+        stat = os.stat(path)
+        stamp[str(Path(path).resolve())] = [stat.st_mtime_ns, stat.st_size]
+    return stamp
+
+
+def knowledge_is_current(vector_db, paths: Iterable[Union[str, Path]], stamp_path: Union[str, Path]) -> bool:
+    """Whether the table has rows and the source files are unchanged since the last load.
+
+    Lets callers skip load() entirely, which would otherwise read, chunk and
+    look up every PDF on each start.
+    """
+    stamp_path = Path(stamp_path)
+    try:
+        if not stamp_path.exists() or not vector_db.exists() or not vector_db.table.count_rows():
+            return False
+        return json.loads(stamp_path.read_text()) == _source_stamp(paths)
+    except (OSError, ValueError) as e:
+        logger.debug(f"Knowledge base stamp not usable: {e}")
+        return False
+
+
+def save_knowledge_stamp(paths: Iterable[Union[str, Path]], stamp_path: Union[str, Path]):
+    """Record the source files a load was made from, for knowledge_is_current()"""
+    stamp_path = Path(stamp_path)
+    try:
+        stamp_path.parent.mkdir(parents=True, exist_ok=True)
+        stamp_path.write_text(json.dumps(_source_stamp(paths)))
+    except OSError as e:
+        logger.debug(f"Could not write knowledge base stamp: {e}")
+
+
+def _index_metric(table, column: str) -> Optional[str]:
+    """Distance metric of the vector index on a column, if there is one"""
+    try:
+        for index in table.list_indices():
+            if column in index.columns:
+                return table.index_stats(index.name).distance_type
+    except Exception as e:
+        logger.debug(f"Could not read vector index metric: {e}")
+    return None
+
+
+def build_search_indexes(vector_db, index_type: str = "IVF_HNSW_SQ", num_partitions: Optional[int] = None,
+                         num_sub_vectors: Optional[int] = None, metric: Optional[str] = None,
+                         min_rows: int = INDEX_MIN_ROWS, rebuild: bool = False) -> bool:
+    """Build the ANN (and, for hybrid search, full-text) index on a LanceDb table.
+
+    The metric defaults to the vector db's distance. Existing indexes are kept
+    unless ``rebuild`` is set, e.g. after new rows were inserted, or the index
+    uses another metric. Returns True if an ANN index is in place.
+    """
+    table = vector_db.table
+    if table is None:
+        return False
+
+    # Hybrid/keyword search otherwise rebuilds the full-text index on first query
+    if vector_db.search_type.value in ("hybrid", "keyword"):
+        try:
+            table.create_fts_index("payload", use_tantivy=vector_db.use_tantivy, replace=rebuild)
+        except Exception as e:
+            logger.debug(f"Keeping existing full-text index: {e}")
+        vector_db.fts_index_exists = True
+
+    n_rows = table.count_rows()
+    if n_rows < min_rows:
+        logger.info(f"Skipping ANN index: {n_rows} rows (< {min_rows})")
+        return False
+
+    metric = metric or LANCE_DISTANCE[vector_db.distance]
+    existing_metric = _index_metric(table, vector_db._vector_col)
+    if existing_metric and existing_metric != metric:
+        logger.info(f"Rebuilding vector index: metric changed from {existing_metric} to {metric}")
+        rebuild = True
+
+    try:
+        table.create_index(
+            metric=metric,
+            index_type=index_type,
+            num_partitions=num_partitions or max(1, int(math.sqrt(n_rows))),
+            num_sub_vectors=num_sub_vectors,
+            vector_column_name=vector_db._vector_col,
+            replace=rebuild,
+        )
+        logger.info(f"Built {index_type} index over {n_rows} rows")
+    except Exception as e:
+        # Raised when the index already exists and rebuild is False
+        logger.debug(f"Keeping existing vector index: {e}")
+    return True
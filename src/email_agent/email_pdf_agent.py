@@ -14,6 +14,7 @@ Features:
 """
 
 import os
+import re
 import time
 import logging
 import smtplib
@@ -27,6 +28,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
 from email import encoders
+from email.utils import parseaddr
 import pypdf
 from dotenv import load_dotenv
 
@@ -36,6 +38,16 @@ from agno.agent import Agent
 from agno.models.openai import OpenAIChat
 from agno.models.anthropic import Claude
 from agno.models.google import Gemini
+try:
+    import ahocorasick
+except ImportError:
+    # Optional: subject keywords fall back to a regex alternation
+    ahocorasick = None
+try:
+    import fitz
+except ImportError:
+    # Optional: PyMuPDF text extraction, otherwise pypdf
+    fitz = None
 try:
     from config import PDFAgentConfig
 except ImportError:
@@ -53,6 +65,39 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def extract_pdf_text(pdf_path: str) -> str:
+    """Extract text from PDF file
+    
+    Kept at module level so it can run in a worker process.
+    """
+    try:
+        parts = []
+        if fitz is not None:
+            with fitz.open(pdf_path) as doc:
+                for page_num, page in enumerate(doc):
+                    page_text = page.get_text("text")
+                    if page_text.strip():
+                        parts.append(f"\n--- Page {page_num + 1} ---\n{page_text}")
+        else:
+            with open(pdf_path, 'rb') as file:
+                pdf_reader = pypdf.PdfReader(file)
+                
+                for page_num, page in enumerate(pdf_reader.pages):
+                    page_text = page.extract_text()
+                    if page_text.strip():
+                        parts.append(f"\n--- Page {page_num + 1} ---\n{page_text}")
+        
+        text = "".join(parts)
+        if not text.strip():
+            raise ValueError("No text content found in PDF")
+        
+        logger.info(f"Successfully extracted {len(text)} characters from PDF")
+        return text
+        
+    except Exception as e:
+        logger.error(f"Error extracting text from PDF: {e}")
+        raise
+
 class EmailPDFAgent:
     """Automated Email-to-PDF Processing Agent"""
     
@@ -60,6 +105,13 @@ class EmailPDFAgent:
         """Initialize the Email PDF Agent"""
         self.config = config or self._load_default_config()
         self.agent = self._create_summarization_agent()
+        
+        # Filters are compiled once and applied to every incoming email
+        self.sender_whitelist = frozenset(
+            s.strip().lower() for s in self.config.get('sender_whitelist') or () if s.strip()
+        )
+        keywords = [k.strip() for k in self.config.get('subject_keywords') or () if k.strip()]
+        self.subject_matcher = self._compile_subject_matcher(keywords)
         self.running = False
         
         # Validate configuration
@@ -163,26 +215,7 @@ class EmailPDFAgent:
     
     def extract_text_from_pdf(self, pdf_path: str) -> str:
         """Extract text from PDF file"""
-        try:
-            text = ""
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = pypdf.PdfReader(file)
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        text += f"\n--- Page {page_num + 1} ---\n"
-                        text += page_text
-                
-            if not text.strip():
-                raise ValueError("No text content found in PDF")
-            
-            logger.info(f"Successfully extracted {len(text)} characters from PDF")
-            return text
-            
-        except Exception as e:
-            logger.error(f"Error extracting text from PDF: {e}")
-            raise
+        return extract_pdf_text(pdf_path)
     
     def summarize_text(self, text: str, filename: str = "") -> str:
         """Summarize text using the LLM agent"""
@@ -290,26 +323,40 @@ class EmailPDFAgent:
     
     def _should_process_email(self, sender: str, subject: str) -> bool:
         """Check if email should be processed based on filters"""
-        # Check sender whitelist
-        if self.config['sender_whitelist']:
-            sender_allowed = any(
-                allowed_sender in sender.lower() 
-                for allowed_sender in self.config['sender_whitelist']
-            )
-            if not sender_allowed:
+        # Check sender whitelist (full address or domain)
+        if self.sender_whitelist:
+            address = parseaddr(sender)[1].lower()
+            domain = address.rpartition('@')[2]
+            if address not in self.sender_whitelist and domain not in self.sender_whitelist:
                 return False
         
         # Check subject keywords
-        if self.config['subject_keywords']:
-            subject_match = any(
-                keyword.lower() in subject.lower()
-                for keyword in self.config['subject_keywords']
-            )
-            if not subject_match:
-                return False
+        if not self.matches_subject(subject):
+            return False
         
         return True
     
+    @staticmethod
+    def _compile_subject_matcher(keywords: List[str]):
+        """Build a matcher that finds any keyword in a single pass over the subject"""
+        if not keywords:
+            return None
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for keyword in keywords:
+                automaton.add_word(keyword.lower(), keyword)
+            automaton.make_automaton()
+            return automaton
+        return re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+    
+    def matches_subject(self, subject: str) -> bool:
+        """Check the subject against the keyword filter (True when no keywords are set)"""
+        if self.subject_matcher is None:
+            return True
+        if ahocorasick is not None:
+            return next(self.subject_matcher.iter(subject.lower()), None) is not None
+        return self.subject_matcher.search(subject) is not None
+    
     def _extract_pdf_attachments(self, email_message) -> List[Tuple[bytes, str]]:
         """Extract PDF attachments from email"""
         pdf_attachments = []
@@ -384,7 +431,7 @@ PDF Summary Report
 
 ---
 This summary was generated automatically by the Email PDF Agent.
-Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Generated on: {datetime.now().isoformat(sep=' ', timespec='seconds')}
 """
             
             msg.attach(MIMEText(email_body, 'plain'))
@@ -419,7 +466,7 @@ PDF Processing Error
 - Original Sender: {original_sender}
 - Original Subject: {original_subject}
 - Error: {error_message}
-- Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+- Time: {datetime.now().isoformat(sep=' ', timespec='seconds')}
 
 The PDF could not be processed. Please check the file manually.
 
@@ -444,44 +491,67 @@ This notification was generated automatically by the Email PDF Agent.
         logger.info("Starting Email PDF Agent...")
         self.running = True
         
-        while self.running:
-            try:
-                # Connect to email server
-                mail = self.connect_to_email()
-                
-                # Get unread emails
-                email_ids = self.get_unread_emails(mail)
-                
-                # Process each email
-                for email_id in email_ids:
-                    if not self.running:
-                        break
+        # One session is kept open across checks; it is only re-established
+        # when the server drops it
+        mail = None
+        try:
+            while self.running:
+                try:
+                    if mail is None:
+                        # Connect to email server
+                        mail = self.connect_to_email()
+                    else:
+                        try:
+                            mail.noop()
+                        except (imaplib.IMAP4.abort, OSError) as e:
+                            logger.warning(f"Email connection lost, reconnecting: {e}")
+                            mail = self.connect_to_email()
                     
-                    try:
-                        processed = self.process_email(mail, email_id)
-                        if processed:
-                            # Mark as read
-                            mail.store(email_id, '+FLAGS', '\\Seen')
-                    except Exception as e:
-                        logger.error(f"Error processing email {email_id}: {e}")
-                
-                # Close email connection
-                mail.close()
-                mail.logout()
-                
-                # Wait before next check
-                if self.running:
-                    logger.info(f"Waiting {self.config['check_interval']} seconds before next check...")
-                    time.sleep(self.config['check_interval'])
-                
-            except KeyboardInterrupt:
-                logger.info("Received interrupt signal, stopping...")
-                self.running = False
-                break
-            except Exception as e:
-                logger.error(f"Unexpected error in main loop: {e}")
-                if self.running:
-                    time.sleep(60)  # Wait before retrying
+                    # Get unread emails
+                    email_ids = self.get_unread_emails(mail)
+                    
+                    # Process each email
+                    for email_id in email_ids:
+                        if not self.running:
+                            break
+                        
+                        try:
+                            processed = self.process_email(mail, email_id)
+                            if processed:
+                                # Mark as read
+                                mail.store(email_id, '+FLAGS', '\\Seen')
+                        except Exception as e:
+                            logger.error(f"Error processing email {email_id}: {e}")
+                    
+                    # Wait before next check
+                    if self.running:
+                        logger.info(f"Waiting {self.config['check_interval']} seconds before next check...")
+                        time.sleep(self.config['check_interval'])
+                    
+                except KeyboardInterrupt:
+                    logger.info("Received interrupt signal, stopping...")
+                    self.running = False
+                    break
+                except Exception as e:
+                    logger.error(f"Unexpected error in main loop: {e}")
+                    self._logout(mail)
+                    mail = None
+                    if self.running:
+                        time.sleep(60)  # Wait before retrying
+        finally:
+            # Close email connection
+            self._logout(mail)
+    
+    @staticmethod
+    def _logout(mail: Optional[imaplib.IMAP4_SSL]):
+        """Close the mailbox and log out, ignoring a dead connection"""
+        if mail is None:
+            return
+        try:
+            mail.close()
+            mail.logout()
+        except Exception:
+            pass
     
     def stop(self):
         """Stop the agent"""
@@ -7,18 +7,32 @@ through the comprehensive legal case analysis pipeline.
 """
 
 import os
+import re
 import time
 import logging
 import tempfile
 import smtplib
+import sqlite3
 import email
+import email.policy
+import copy
+import threading
+from collections import OrderedDict
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Set
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.parser import BytesParser
+from imapclient import IMAPClient
+from agno.agent import Agent
 from email_pdf_agent import EmailPDFAgent  
 from legal_case_processor import LegalCaseProcessor
+from legal_case_config import (
+    LEGAL_KEYWORDS, STRONG_LEGAL_KEYWORDS, LAW_FIRM_SENDER_PATTERN, LEGAL_KW_AUTOMATON, LEGAL_KW_PATTERN
+)
 
 # Configure logging
 logging.basicConfig(
@@ -31,37 +45,217 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Most recent processed email UIDs kept in memory and on disk
+PROCESSED_EMAILS_LIMIT = 10000
+
+# Modern (EmailMessage) parser; decodes encoded headers such as =?utf-8?...?=
+EMAIL_PARSER = BytesParser(policy=email.policy.default)
+
+# Emails analyzed and reported concurrently
+EMAIL_WORKERS = 4
+
+# Email body text kept for analysis
+MAX_BODY_CHARS = 256 * 1024
+
+# Re-issue IMAP IDLE before the server's 30 minute timeout
+IDLE_RENEW_SECONDS = 28 * 60
+
+class SMTPConnection:
+    """Authenticated SMTP connection shared by every sender that holds it
+    
+    Email workers are shallow copies of the monitor, so they all reference
+    this one holder and reuse (and close) the same session.
+    """
+    
+    def __init__(self, server: str, port: int, username: str, password: str):
+        self._server = server
+        self._port = port
+        self._username = username
+        self._password = password
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._lock = threading.Lock()
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Return the open connection, reconnecting if it has dropped"""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except smtplib.SMTPException:
+                pass
+            self._quit()
+        
+        server = smtplib.SMTP(self._server, self._port)
+        server.starttls()
+        server.login(self._username, self._password)
+        self._smtp = server
+        return server
+    
+    def _quit(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
+    
+    def send(self, msg: MIMEMultipart):
+        """Send a message, retrying once on disconnect"""
+        with self._lock:
+            try:
+                self._connect().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._smtp = None
+                self._connect().send_message(msg)
+    
+    def close(self):
+        """Close the connection"""
+        with self._lock:
+            self._quit()
+
 class LegalCaseMonitor(LegalCaseProcessor):
     """Enhanced email monitor for legal case processing"""
     
     def __init__(self, config: Optional[Dict] = None):
         """Initialize the Legal Case Monitor"""
         super().__init__(config)
-        self.processed_emails = set()  # Track processed email UIDs
+        # Recently processed email UIDs (LRU), persisted so restarts don't reprocess
+        self.processed_emails = OrderedDict()
+        # Highest UID already searched, valid while the folder's UIDVALIDITY is unchanged
+        self._uid_validity = None
+        self._last_uid = 0
+        self._processed_db = self._open_processed_db(
+            self.config.get('processed_emails_db', 'processed_emails.db')
+        )
+        
+        # Settings used on every poll and send
+        self._smtp_server = self.config['smtp_server']
+        self._smtp_port = self.config['smtp_port']
+        self._sender_email = self.config['sender_email']
+        self._sender_password = self.config['sender_password']
+        self._recipient_email = self.config['recipient_email']
+        self._monitor_folder = self.config['monitor_folder']
+        self._check_interval = self.config['check_interval']
+        
+        # Authenticated SMTP connection shared by all sends, including workers'
+        self._smtp = SMTPConnection(
+            self._smtp_server, self._smtp_port, self._sender_email, self._sender_password
+        )
+        
+        # Fetching stays on the IMAP connection; analysis and reporting run here
+        self._executor = ThreadPoolExecutor(max_workers=EMAIL_WORKERS)
         
-        # Legal case specific keywords for filtering
-        self.legal_keywords = [
-            'case', 'claim', 'accident', 'injury', 'medical records',
-            'police report', 'demand letter', 'settlement', 'litigation',
-            'plaintiff', 'defendant', 'attorney', 'lawyer', 'law firm',
-            'insurance', 'liability', 'damages', 'auto accident',
-            'slip and fall', 'personal injury', 'workers comp'
-        ]
+        # Legal case specific keywords for filtering, shared with the config
+        self.legal_keywords = LEGAL_KEYWORDS
+        self._strong_keywords = frozenset(STRONG_LEGAL_KEYWORDS)
+        self._kw_automaton = LEGAL_KW_AUTOMATON
+        self._legal_kw_re = LEGAL_KW_PATTERN
+        self._law_firm_re = LAW_FIRM_SENDER_PATTERN
         
         logger.info("Legal Case Monitor initialized")
     
+    def _iter_legal_keywords(self, text: str) -> Iterator[str]:
+        """Lazily yield legal keywords found in lowercased text, in a single pass"""
+        if self._kw_automaton is not None:
+            return (keyword for _, keyword in self._kw_automaton.iter(text))
+        return (match.group(1) for match in self._legal_kw_re.finditer(text))
+    
+    def _match_legal_keywords(self, text: str, limit: Optional[int] = None,
+                              found: Optional[Set[str]] = None) -> Set[str]:
+        """Distinct legal keywords in lowercased text, stopping once limit are found"""
+        found = set() if found is None else found
+        if limit is not None and len(found) >= limit:
+            return found
+        for keyword in self._iter_legal_keywords(text):
+            found.add(keyword)
+            if limit is not None and len(found) >= limit:
+                break
+        return found
+    
+    def _has_strong_keyword(self, text: str) -> bool:
+        """Whether lowercased text contains a strong legal indicator"""
+        return any(keyword in self._strong_keywords for keyword in self._iter_legal_keywords(text))
+    
+    def _open_processed_db(self, path: str) -> Optional[sqlite3.Connection]:
+        """Open the processed-email store and load the most recent UIDs"""
+        try:
+            db = sqlite3.connect(path)
+            db.execute("CREATE TABLE IF NOT EXISTS processed (uid TEXT PRIMARY KEY)")
+            db.execute("CREATE TABLE IF NOT EXISTS monitor_state (name TEXT PRIMARY KEY, value INTEGER)")
+            rows = db.execute(
+                "SELECT uid FROM processed ORDER BY rowid DESC LIMIT ?", (PROCESSED_EMAILS_LIMIT,)
+            ).fetchall()
+            for (uid,) in reversed(rows):
+                self.processed_emails[uid] = None
+            for name, value in db.execute("SELECT name, value FROM monitor_state"):
+                if name == 'uid_validity':
+                    self._uid_validity = value
+                elif name == 'last_uid':
+                    self._last_uid = value
+            return db
+        except sqlite3.Error as e:
+            logger.warning(f"Processed emails will not persist across restarts: {e}")
+            return None
+    
+    def _save_state(self, **values: int):
+        """Persist monitor state values such as the last searched UID"""
+        if self._processed_db is None:
+            return
+        try:
+            self._processed_db.executemany(
+                "INSERT OR REPLACE INTO monitor_state (name, value) VALUES (?, ?)", values.items()
+            )
+            self._processed_db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error saving monitor state: {e}")
+    
+    def _is_processed(self, uid: str) -> bool:
+        return uid in self.processed_emails
+    
+    def _mark_processed(self, uid: str):
+        """Remember a processed email UID, evicting the oldest beyond the limit"""
+        self.processed_emails[uid] = None
+        self.processed_emails.move_to_end(uid)
+        evicted = len(self.processed_emails) > PROCESSED_EMAILS_LIMIT
+        if evicted:
+            self.processed_emails.popitem(last=False)
+        
+        if self._processed_db is None:
+            return
+        try:
+            # REPLACE moves the UID to the newest rowid
+            self._processed_db.execute("INSERT OR REPLACE INTO processed (uid) VALUES (?)", (uid,))
+            if evicted:
+                self._processed_db.execute(
+                    "DELETE FROM processed WHERE rowid NOT IN "
+                    "(SELECT rowid FROM processed ORDER BY rowid DESC LIMIT ?)",
+                    (PROCESSED_EMAILS_LIMIT,),
+                )
+            self._processed_db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error saving processed email {uid}: {e}")
+    
     def is_legal_case_email(self, subject: str, body: str, sender: str) -> bool:
         """Determine if email contains legal case information"""
+        return self._classify_email(subject, body.lower(), sender)
+    
+    def _classify_email(self, subject: str, body_lower: str, sender: str) -> bool:
+        """Legal case check on an already lowercased body
+        
+        Scanning stops at the second distinct keyword, and the short subject
+        is scanned first so the body is often not needed at all.
+        """
         try:
-            # Check subject and body for legal keywords
-            content = f"{subject} {body}".lower()
-            
-            # Count keyword matches
-            keyword_matches = sum(1 for keyword in self.legal_keywords if keyword in content)
-            
             # Check for law firm domain patterns
-            law_firm_domains = ['.law', 'legal', 'attorney', 'lawyer']
-            is_law_firm = any(domain in sender.lower() for domain in law_firm_domains)
+            is_law_firm = bool(self._law_firm_re.search(sender))
+            
+            # Count distinct keyword matches, up to the threshold
+            keywords = set()
+            if not is_law_firm:
+                self._match_legal_keywords(subject.lower(), limit=2, found=keywords)
+                self._match_legal_keywords(body_lower, limit=2, found=keywords)
+            keyword_matches = len(keywords)
             
             # Determine if this is likely a legal case email
             is_legal = keyword_matches >= 2 or is_law_firm
@@ -76,117 +270,32 @@ class LegalCaseMonitor(LegalCaseProcessor):
             return False
     
     def monitor_and_process(self):
-        """Main monitoring loop for legal case emails"""
+        """Main monitoring loop for legal case emails
+        
+        Keeps one IMAP connection open and waits in IDLE for the server to
+        announce new mail instead of reconnecting and searching on a timer.
+        """
         logger.info("Starting legal case email monitoring...")
         
+        client = None
         try:
+            check_interval = self._check_interval
+            
             while self.running:
                 try:
-                    # Connect to email
-                    mail = self.connect_to_email()
-                    
-                    # Search for unread emails
-                    mail.select(self.config['monitor_folder'])
-                    status, messages = mail.search(None, 'UNSEEN')
-                    
-                    if status == 'OK' and messages[0]:
-                        email_ids = messages[0].split()
-                        logger.info(f"Found {len(email_ids)} unread emails")
-                        
-                        for email_id in email_ids:
-                            try:
-                                # Skip if already processed
-                                if email_id in self.processed_emails:
-                                    continue
-                                
-                                # Fetch email
-                                email_data = self._fetch_email(mail, email_id)
-                                if not email_data:
-                                    continue
-                                
-                                subject = email_data.get('subject', '')
-                                body = email_data.get('body', '')
-                                sender = email_data.get('sender', '')
-                                attachments = email_data.get('attachments', [])
-                                
-                                logger.info(f"Processing email: {subject} from {sender}")
-                                
-                                # Check if this is a legal case email
-                                if not self.is_legal_case_email(subject, body, sender):
-                                    logger.info("Email does not appear to contain legal case information, skipping")
-                                    self.processed_emails.add(email_id)
-                                    continue
-                                
-                                # Filter for PDF attachments
-                                pdf_attachments = [att for att in attachments if att.get('filename', '').lower().endswith('.pdf')]
-                                
-                                if not pdf_attachments and not any(keyword in body.lower() for keyword in self.legal_keywords[:5]):
-                                    logger.info("No PDFs found and no strong legal indicators, skipping")
-                                    self.processed_emails.add(email_id)
-                                    continue
-                                
-                                # Save PDF attachments temporarily
-                                temp_pdf_paths = []
-                                for attachment in pdf_attachments:
-                                    temp_path = self._save_temp_attachment(attachment)
-                                    if temp_path:
-                                        temp_pdf_paths.append(temp_path)
-                                
-                                # Process the legal case
-                                try:
-                                    report = self.process_legal_case_email(
-                                        email_body=body,
-                                        pdf_attachments=temp_pdf_paths,
-                                        sender_email=sender,
-                                        subject=subject
-                                    )
-                                    
-                                    # Send comprehensive report
-                                    self._send_legal_case_report(
-                                        report=report,
-                                        original_sender=sender,
-                                        original_subject=subject,
-                                        original_date=email_data.get('date', ''),
-                                        pdf_count=len(pdf_attachments)
-                                    )
-                                    
-                                    logger.info("Legal case processed and report sent successfully")
-                                    
-                                except Exception as e:
-                                    logger.error(f"Error processing legal case: {e}")
-                                    self._send_error_notification(sender, subject, str(e))
-                                
-                                finally:
-                                    # Clean up temporary files
-                                    for temp_path in temp_pdf_paths:
-                                        try:
-                                            os.unlink(temp_path)
-                                        except:
-                                            pass
-                                
-                                # Mark as processed
-                                self.processed_emails.add(email_id)
-                                
-                            except Exception as e:
-                                logger.error(f"Error processing email {email_id}: {e}")
-                                continue
+                    if client is None:
+                        client = self._connect_imap()
                     
-                    else:
-                        logger.debug("No new emails found")
+                    self._process_unseen(client)
                     
-                    # Close email connection
-                    try:
-                        mail.close()
-                        mail.logout()
-                    except:
-                        pass
-                    
-                    # Wait before next check
+                    # Wait for new mail
                     if self.running:
-                        time.sleep(self.config['check_interval'])
+                        self._wait_for_new_mail(client, check_interval)
                 
                 except Exception as e:
                     logger.error(f"Error in monitoring loop: {e}")
+                    self._close_imap(client)
+                    client = None
                     time.sleep(60)  # Wait longer on error
         
         except KeyboardInterrupt:
@@ -194,31 +303,179 @@ class LegalCaseMonitor(LegalCaseProcessor):
         except Exception as e:
             logger.error(f"Fatal error in monitoring: {e}")
         finally:
+            self._close_imap(client)
+            self.close()
+            self.shutdown()
             self.running = False
             logger.info("Legal case monitoring stopped")
     
-    def _save_temp_attachment(self, attachment: Dict) -> Optional[str]:
-        """Save email attachment to temporary file"""
+    def _connect_imap(self) -> IMAPClient:
+        """Open an IMAP connection on the monitored folder"""
+        client = IMAPClient(self.config['imap_server'], port=self.config['imap_port'], ssl=True)
+        client.login(self.config['email_address'], self.config['email_password'])
+        folder = client.select_folder(self._monitor_folder)
+        
+        # UIDs from a previous UIDVALIDITY no longer identify the same messages
+        uid_validity = folder.get(b'UIDVALIDITY')
+        if uid_validity != self._uid_validity:
+            self._uid_validity = uid_validity
+            self._last_uid = 0
+            self._save_state(uid_validity=uid_validity, last_uid=0)
+        logger.info(f"Connected to email server: {self.config['imap_server']}")
+        return client
+    
+    @staticmethod
+    def _close_imap(client: Optional[IMAPClient]):
+        if client is None:
+            return
         try:
-            filename = attachment.get('filename', 'attachment.pdf')
-            content = attachment.get('content', b'')
-            
-            if not content:
-                return None
-            
-            # Create temporary file
-            temp_dir = tempfile.gettempdir()
-            temp_path = os.path.join(temp_dir, f"legal_case_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{filename}")
-            
-            with open(temp_path, 'wb') as f:
-                f.write(content)
-            
-            logger.info(f"Saved attachment to: {temp_path}")
-            return temp_path
-            
+            client.logout()
+        except Exception:
+            pass
+    
+    def _wait_for_new_mail(self, client: IMAPClient, check_interval: int):
+        """Block until the server reports new mail (IMAP IDLE) or IDLE needs renewing
+        
+        Servers drop IDLE after 30 minutes, so it is re-issued every
+        IDLE_RENEW_SECONDS. Without IDLE support this is a plain sleep.
+        """
+        if not client.has_capability('IDLE'):
+            time.sleep(check_interval)
+            return
+        
+        client.idle()
+        try:
+            started = time.monotonic()
+            # Wake up every check_interval to notice stop_monitoring()
+            while self.running and time.monotonic() - started < IDLE_RENEW_SECONDS:
+                responses = client.idle_check(timeout=check_interval)
+                if any(len(response) > 1 and response[1] == b'EXISTS' for response in responses):
+                    break
+        finally:
+            client.idle_done()
+    
+    def _process_unseen(self, client: IMAPClient):
+        """Process all unread emails in the monitored folder
+        
+        Emails are fetched one by one and analyzed concurrently; the batch is
+        finished before waiting for new mail.
+        """
+        # Only search past the high-water mark; "N:*" also matches the highest
+        # existing UID when it is below N, hence the filter
+        last_uid = self._last_uid
+        uids = [uid for uid in client.search(['UID', f'{last_uid + 1}:*', 'UNSEEN']) if uid > last_uid]
+        if not uids:
+            logger.debug("No new emails found")
+            return
+        
+        logger.info(f"Found {len(uids)} unread emails")
+        uids.sort()
+        failed_uids = []
+        futures = {}
+        for uid in uids:
+            try:
+                # Skip if already processed
+                if self._is_processed(str(uid)):
+                    continue
+                
+                email_data = self._fetch_email(client, uid)
+                if not email_data:
+                    failed_uids.append(uid)
+                    continue
+                if email_data.get('screened_out'):
+                    logger.info(f"Skipping email without legal indicators in its headers: {email_data['subject']}")
+                    self._mark_processed(str(uid))
+                    continue
+                futures[self._executor.submit(self._process_email, email_data)] = uid
+            except Exception as e:
+                logger.error(f"Error processing email {uid}: {e}")
+                failed_uids.append(uid)
+        
+        for future in as_completed(futures):
+            uid = futures[future]
+            try:
+                future.result()
+                # Mark as processed
+                self._mark_processed(str(uid))
+            except Exception as e:
+                logger.error(f"Error processing email {uid}: {e}")
+        
+        # Fetching marks the emails seen, so they are not searched for again.
+        # An email whose fetch failed is still unseen; stop the mark below it
+        # so the next poll retries it.
+        if failed_uids:
+            logger.warning(f"Will retry {len(failed_uids)} emails that could not be fetched")
+            new_last_uid = max((uid for uid in uids if uid < failed_uids[0]), default=last_uid)
+        else:
+            new_last_uid = uids[-1]
+        if new_last_uid > last_uid:
+            self._last_uid = new_last_uid
+            self._save_state(last_uid=self._last_uid)
+    
+    def _process_email(self, email_data: Dict):
+        """Analyze one fetched email and send the legal case report"""
+        pdf_attachments = email_data.get('attachments', [])
+        try:
+            # Agents keep per-run state, so each email gets its own copies
+            worker = copy.copy(self)
+            for name, value in vars(self).items():
+                if isinstance(value, Agent):
+                    setattr(worker, name, value.deep_copy())
+            worker._handle_legal_case(email_data, pdf_attachments)
+        finally:
+            # Clean up temporary files
+            self._remove_attachments(pdf_attachments)
+    
+    def _handle_legal_case(self, email_data: Dict, pdf_attachments: List[Dict]):
+        """Run the legal case analysis for a fetched email and report the result"""
+        subject = email_data.get('subject', '')
+        body = email_data.get('body', '')
+        sender = email_data.get('sender', '')
+
+        logger.info(f"Processing email: {subject} from {sender}")
+
+        # Check if this is a legal case email
+        body_lower = body.lower()
+        if not self._classify_email(subject, body_lower, sender):
+            logger.info("Email does not appear to contain legal case information, skipping")
+            return
+
+        if not pdf_attachments and not self._has_strong_keyword(body_lower):
+            logger.info("No PDFs found and no strong legal indicators, skipping")
+            return
+
+        # Process the legal case
+        try:
+            report = self.process_legal_case_email(
+                email_body=body,
+                pdf_attachments=[attachment['path'] for attachment in pdf_attachments],
+                sender_email=sender,
+                subject=subject
+            )
+
+            # Send comprehensive report
+            self._send_legal_case_report(
+                report=report,
+                original_sender=sender,
+                original_subject=subject,
+                original_date=email_data.get('date', ''),
+                pdf_count=len(pdf_attachments)
+            )
+
+            logger.info("Legal case processed and report sent successfully")
+
         except Exception as e:
-            logger.error(f"Error saving attachment: {e}")
-            return None
+            logger.error(f"Error processing legal case: {e}")
+            self._send_error_notification(sender, subject, str(e))
+    
+    @staticmethod
+    def _remove_attachments(attachments: List[Dict]):
+        """Delete the temporary files of fetched attachments"""
+        for attachment in attachments:
+            try:
+                os.unlink(attachment['path'])
+            except OSError:
+                pass
     
     def _send_legal_case_report(self, report: str, original_sender: str, 
                               original_subject: str, original_date: str, pdf_count: int):
@@ -226,8 +483,8 @@ class LegalCaseMonitor(LegalCaseProcessor):
         try:
             # Create email
             msg = MIMEMultipart()
-            msg['From'] = self.config['sender_email']
-            msg['To'] = self.config['recipient_email']
+            msg['From'] = self._sender_email
+            msg['To'] = self._recipient_email
             msg['Subject'] = f"Legal Case Analysis: {original_subject}"
             
             # Email body with report
@@ -247,18 +504,15 @@ Original Email Details:
 
 ---
 This report was generated automatically by the Legal Case Processing Agent.
-Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Generated at: {datetime.now().isoformat(sep=' ', timespec='seconds')}
             """
             
             msg.attach(MIMEText(email_body, 'plain'))
             
             # Send email
-            with smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port']) as server:
-                server.starttls()
-                server.login(self.config['sender_email'], self.config['sender_password'])
-                server.send_message(msg)
+            self._send_message(msg)
             
-            logger.info(f"Legal case report sent to {self.config['recipient_email']}")
+            logger.info(f"Legal case report sent to {self._recipient_email}")
             
         except Exception as e:
             logger.error(f"Error sending legal case report: {e}")
@@ -267,8 +521,8 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         """Send error notification"""
         try:
             msg = MIMEMultipart()
-            msg['From'] = self.config['sender_email']
-            msg['To'] = self.config['recipient_email']
+            msg['From'] = self._sender_email
+            msg['To'] = self._recipient_email
             msg['Subject'] = f"Legal Case Processing Error: {original_subject}"
             
             email_body = f"""
@@ -286,21 +540,26 @@ Error Details:
 
 Please review the email manually or check the system logs.
 
-Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Generated at: {datetime.now().isoformat(sep=' ', timespec='seconds')}
             """
             
             msg.attach(MIMEText(email_body, 'plain'))
             
-            with smtplib.SMTP(self.config['smtp_server'], self.config['smtp_port']) as server:
-                server.starttls()
-                server.login(self.config['sender_email'], self.config['sender_password'])
-                server.send_message(msg)
+            self._send_message(msg)
             
             logger.info("Error notification sent")
             
         except Exception as e:
             logger.error(f"Error sending error notification: {e}")
     
+    def _send_message(self, msg: MIMEMultipart):
+        """Send a message over the shared SMTP connection"""
+        self._smtp.send(msg)
+    
+    def close(self):
+        """Close the shared SMTP connection"""
+        self._smtp.close()
+    
     def start_monitoring(self):
         """Start the monitoring process"""
         self.running = True
@@ -312,26 +571,81 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         self.running = False
         logger.info("Stopping legal case email monitoring...")
     
-    def _fetch_email(self, mail, email_id):
-        """Fetch email data from the server"""
+    def _may_be_legal_case(self, subject: str, sender: str, has_pdf: bool = False) -> bool:
+        """Header-only screen: a PDF attachment, a law firm sender or a legal keyword in the subject
+        
+        Forwarded documents often arrive with a plain subject from a personal
+        address, so any email carrying a PDF gets the full analysis.
+        """
+        if has_pdf or self._law_firm_re.search(sender):
+            return True
+        return next(self._iter_legal_keywords(subject.lower()), None) is not None
+    
+    @classmethod
+    def _has_pdf_part(cls, body) -> bool:
+        """Whether a BODYSTRUCTURE has a PDF part, by MIME type or file name"""
+        if body is None:
+            return False
+        if body.is_multipart:
+            return any(cls._has_pdf_part(part) for part in body[0])
+        
+        def values(fields):
+            for field in fields:
+                if isinstance(field, (tuple, list)):
+                    yield from values(field)
+                elif isinstance(field, (bytes, str)):
+                    yield field.decode('utf-8', errors='ignore') if isinstance(field, bytes) else field
+        
+        content_type = "/".join(islice(values(body[:2]), 2)).lower()
+        return content_type == 'application/pdf' or any(
+            value.lower().endswith('.pdf') for value in values(body[2:])
+        )
+    
+    @staticmethod
+    def _decode_text(part) -> str:
+        """Decoded text of a message part ('' when it has no payload)"""
+        return (part.get_payload(decode=True) or b"").decode('utf-8', errors='ignore')
+    
+    def _fetch_email(self, client: IMAPClient, uid: int):
+        """Fetch email data from the server
+        
+        Only PDF attachments within max_pdf_size are kept; each is saved to a
+        temporary file whose path is returned and must be removed by the caller.
+        """
+        attachments = []
         try:
             # Fetch the email
-            status, msg_data = mail.fetch(email_id, '(RFC822)')
-            if status != 'OK':
-                logger.error(f"Failed to fetch email {email_id}")
+            msg_data = client.fetch([uid], ['BODYSTRUCTURE', 'RFC822']).get(uid)
+            if not msg_data:
+                logger.error(f"Failed to fetch email {uid}")
                 return None
             
-            # Parse the email
-            msg = email.message_from_bytes(msg_data[0][1])
+            # Parse the headers first; most inbox traffic is ruled out by them
+            raw = msg_data[b'RFC822']
+            headers = EMAIL_PARSER.parsebytes(raw, headersonly=True)
             
             # Extract basic information
-            subject = msg.get('Subject', '')
-            sender = msg.get('From', '')
-            date = msg.get('Date', '')
+            subject = str(headers.get('Subject', ''))
+            sender = str(headers.get('From', ''))
+            date = str(headers.get('Date', ''))
+            
+            has_pdf = self._has_pdf_part(msg_data.get(b'BODYSTRUCTURE'))
+            if not self._may_be_legal_case(subject, sender, has_pdf):
+                return {
+                    'subject': subject,
+                    'sender': sender,
+                    'date': date,
+                    'body': '',
+                    'attachments': [],
+                    'screened_out': True
+                }
+            
+            # Parse the full MIME tree only for candidate legal emails
+            msg = EMAIL_PARSER.parsebytes(raw)
             
             # Extract body
-            body = ""
-            attachments = []
+            body_parts = []
+            body_size = 0
             
             if msg.is_multipart():
                 for part in msg.walk():
@@ -339,23 +653,35 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                     content_disposition = str(part.get("Content-Disposition"))
                     
                     if content_type == "text/plain" and "attachment" not in content_disposition:
-                        try:
-                            body += part.get_payload(decode=True).decode('utf-8', errors='ignore')
-                        except:
-                            body += str(part.get_payload())
+                        # Keyword detection doesn't need more than MAX_BODY_CHARS of text
+                        if body_size < MAX_BODY_CHARS:
+                            text = self._decode_text(part)
+                            body_parts.append(text)
+                            body_size += len(text)
                     
                     elif "attachment" in content_disposition:
+                        # Only PDFs are analyzed, so don't decode anything else
                         filename = part.get_filename()
-                        if filename:
-                            attachments.append({
-                                'filename': filename,
-                                'content': part.get_payload(decode=True)
-                            })
+                        if not filename or not filename.lower().endswith('.pdf'):
+                            continue
+                        
+                        # Base64 decodes to ~3/4 of the encoded size
+                        encoded_size = len(part.get_payload())
+                        if encoded_size * 3 // 4 > self.config['max_pdf_size']:
+                            logger.warning(f"PDF {filename} too large (~{encoded_size * 3 // 4} bytes)")
+                            continue
+                        
+                        # Write straight to disk so the decoded bytes are released per part
+                        with tempfile.NamedTemporaryFile(
+                            delete=False, prefix='legal_case_', suffix=f"_{os.path.basename(filename)}"
+                        ) as temp_file:
+                            attachments.append({'filename': filename, 'path': temp_file.name})
+                            temp_file.write(part.get_payload(decode=True) or b"")
+                        logger.info(f"Saved attachment to: {temp_file.name}")
             else:
-                try:
-                    body = msg.get_payload(decode=True).decode('utf-8', errors='ignore')
-                except:
-                    body = str(msg.get_payload())
+                body_parts.append(self._decode_text(msg))
+            
+            body = "".join(body_parts)[:MAX_BODY_CHARS]
             
             return {
                 'subject': subject,
@@ -366,7 +692,8 @@ Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             }
             
         except Exception as e:
-            logger.error(f"Error fetching email {email_id}: {e}")
+            logger.error(f"Error fetching email {uid}: {e}")
+            self._remove_attachments(attachments)
             return None
 
 def main():
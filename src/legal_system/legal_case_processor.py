@@ -15,21 +15,38 @@ Pipeline:
 
 import os
 import re
+import sys
 import json
+import time
+import asyncio
+import hashlib
 import logging
+import sqlite3
+import threading
 import requests
+import httpx
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from collections import OrderedDict
+from itertools import islice
+from functools import lru_cache
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from types import SimpleNamespace
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import smtplib
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 from agno.agent import Agent
 from agno.models.openai import OpenAIChat
 from agno.models.anthropic import Claude
 from agno.models.google import Gemini
-from email_pdf_agent import EmailPDFAgent
+from openai import OpenAI
+from anthropic import Anthropic
+from email_pdf_agent import EmailPDFAgent, extract_pdf_text
+from legal_case_config import GENERIC_DOMAINS
 
 # Configure logging
 logging.basicConfig(
@@ -42,15 +59,329 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
-class CaseData:
+# API key environment variable of each provider with a shared SDK client
+PROVIDER_API_KEY_ENV = {
+    'openai': 'OPENAI_API_KEY',
+    'anthropic': 'ANTHROPIC_API_KEY',
+}
+
+@lru_cache(maxsize=1)
+def _report_timestamp(seconds: int) -> str:
+    """Local 'YYYY-MM-DD HH:MM:SS' for a Unix time, formatted once per second"""
+    return datetime.fromtimestamp(seconds).isoformat(sep=' ', timespec='seconds')
+
+# Characters that matter when scanning for a balanced JSON object
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+
+def _find_json_object(text: str) -> Optional[str]:
+    """Return the first balanced {...} block in text, ignoring braces inside strings
+    
+    A single forward pass that only visits brace, quote and backslash
+    characters, unlike a greedy regex that runs to the last brace.
+    """
+    depth = 0
+    start = -1
+    in_string = False
+    escaped_pos = -1
+    for match in _JSON_TOKEN_RE.finditer(text):
+        pos = match.start()
+        if pos == escaped_pos:
+            continue
+        char = match.group()
+        if in_string:
+            if char == '\\':
+                escaped_pos = pos + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            if depth:
+                in_string = True
+        elif char == '{':
+            if depth == 0:
+                start = pos
+            depth += 1
+        elif char == '}' and depth:
+            depth -= 1
+            if depth == 0:
+                return text[start:pos + 1]
+    return None
+
+# Slotted result dataclasses where supported (dataclass slots need Python 3.10+)
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Line prefixes that mark list items in agent responses
+BULLET_CHARS = frozenset('•-*')
+
+# Location analysis cues, searched case-insensitively in the raw response;
+# checked in this order so a liberal/tort-friendly mention still wins
+LIBERAL_RE = re.compile(r'liberal|democrat', re.I)
+CONSERVATIVE_RE = re.compile(r'conservative|republican', re.I)
+TORT_FRIENDLY_RE = re.compile(r'(?:tort|plaintiff)[- ]friendly', re.I)
+TORT_HOSTILE_RE = re.compile(r'tort[- ]hostile|defense[- ]friendly', re.I)
+
+# Mentions that mark a case as having police reports to extract
+POLICE_REPORT_RE = re.compile(r'(?:police|incident|accident) report', re.I)
+
+# Lines that start a new report when several are combined in one document;
+# matches from the start of such a line
+REPORT_SEPARATOR_RE = re.compile(
+    r'^[^\n]*?(?:(?:police|incident|accident) report|report (?:number|#))', re.I | re.M
+)
+
+# Separated "reports" with no more words than this are treated as false positives
+MIN_REPORT_WORDS = 50
+WORD_RE = re.compile(r'\S+')
+
+# Headings that open the findings / recommendations sections of an analysis
+KEY_FINDING_RE = re.compile(r'key evidence|important|critical|red flag', re.I)
+RECOMMENDATION_RE = re.compile(r'recommendation', re.I)
+
+# Consumer mailbox providers; an attorney writing from one is not firm-verified
+FREE_EMAIL_DOMAINS = frozenset(GENERIC_DOMAINS)
+
+# Re-prompts after a structured response fails validation
+STRUCTURED_OUTPUT_RETRIES = 2
+
+# How often a submitted batch job is checked for completion
+BATCH_POLL_SECONDS = 60
+
+# Documents longer than this (about 15K tokens) are cut in the middle
+# before extraction; headers and signatures live at the start and end
+MAX_INPUT_CHARS = 60_000
+
+def _truncate_middle(text: str, limit: int = MAX_INPUT_CHARS) -> str:
+    """Keep the first and last limit/2 characters of text"""
+    if not text or len(text) <= limit:
+        return text
+    half = limit // 2
+    return f"{text[:half]}\n...[TRUNCATED]...\n{text[-half:]}"
+
+# Static part of the case data extraction prompt; the email body and PDF
+# text are appended per call so the prefix stays byte-identical
+CASE_DATA_PROMPT = """Please extract the following case information from the provided content and format as JSON:
+
+{
+    "client_name": "Name of the injured party/claimant",
+    "date_of_loss": "Date when accident/incident occurred",
+    "accident_type": "Type of accident (auto, slip/fall, etc.)",
+    "injuries": ["List of specific injuries mentioned"],
+    "treatment": ["List of medical treatments received"],
+    "medical_providers": ["Names of doctors, hospitals, clinics"],
+    "insurance_info": "Insurance company and coverage details",
+    "policy_limits": "Policy limits if mentioned",
+    "liability_info": "Liability/fault information",
+    "attorney_name": "Name of the attorney/lawyer",
+    "attorney_email": "Email address of attorney",
+    "law_firm": "Name of law firm",
+    "accident_location": "Location where accident occurred"
+}
+
+Important: Only include information that is explicitly stated. Use null for missing information.
+
+Content to analyze:
+"""
+
+# Police report schema, split into identifying details and the narrative
+# analysis so each half can be extracted by a separate, shorter call
+POLICE_HEADER_FIELDS = {
+    "report_number": "Report number of the police report",
+    "report_date": "Date when the report was filed",
+    "incident_date": "Date when the incident occurred",
+    "incident_time": "Time when the incident occurred",
+    "location": "Location of the incident",
+    "officers": ["List of officers mentioned in the report"],
+    "parties_involved": ["List of parties involved in the incident"],
+    "vehicles": ["List of vehicles involved"],
+}
+POLICE_NARRATIVE_FIELDS = {
+    "violations": ["List of violations or charges"],
+    "narrative": "Narrative description of the incident",
+    "weather_conditions": "Weather conditions at the time of the incident",
+    "road_conditions": "Road conditions at the time of the incident",
+    "traffic_control": "Traffic control measures in place",
+    "damage_assessment": "Assessment of damages",
+    "injuries_reported": ["List of reported injuries"],
+    "fault_determination": "Determination of fault or liability",
+    "witness_statements": ["List of witness statements"],
+    "citations_issued": ["List of citations issued"],
+    "towed_vehicles": ["List of towed vehicles"],
+    "property_damage": "Description of property damage",
+}
+
+def _police_report_schema_prompt(fields: Dict[str, Any]) -> str:
+    """Static extraction instructions for the given police report fields"""
+    return (
+        "Please extract the following police report information from the provided text and format as JSON:\n\n"
+        f"{json.dumps(fields, indent=4, ensure_ascii=False)}\n\n"
+        "Important: Only include information that is explicitly stated. Use null for missing information.\n"
+    )
+
+# Static parts of the police report extraction prompts. They come before the
+# report text so providers can cache them as shared prompt prefixes.
+POLICE_REPORT_PROMPT = _police_report_schema_prompt({**POLICE_HEADER_FIELDS, **POLICE_NARRATIVE_FIELDS})
+POLICE_HEADER_PROMPT = _police_report_schema_prompt(POLICE_HEADER_FIELDS)
+POLICE_NARRATIVE_PROMPT = _police_report_schema_prompt(POLICE_NARRATIVE_FIELDS)
+
+# Static part of the multi-report analysis prompt, ahead of the case
+# details and report summaries for the same prompt-prefix caching
+MULTI_REPORT_PROMPT = """Analyze the following multiple police reports for a legal case and provide comprehensive insights.
+
+Please provide a detailed analysis covering:
+
+1. **Consistency Analysis**: Are the reports consistent with each other? Any discrepancies in facts, dates, locations, or fault determinations?
+
+2. **Fault and Liability**: What do the reports indicate about fault and liability? Are there clear patterns or conflicting assessments?
+
+3. **Injury Correlation**: How do reported injuries in police reports align with the case medical information?
+
+4. **Key Evidence**: What are the most important pieces of evidence from these reports?
+
+5. **Red Flags**: Any concerning inconsistencies, missing information, or suspicious patterns?
+
+6. **Overall Assessment**: How do these reports strengthen or weaken the case?
+
+7. **Recommendations**: What additional information or clarification should be requested?
+
+Format your response with clear headings and bullet points for easy reading.
+"""
+
+# Bump when agent prompts change so cached responses are not reused
+PROMPT_VERSION = 7
+
+# Cached agent responses expire after 30 days
+ANALYSIS_CACHE_TTL = 30 * 24 * 3600
+
+class AnalysisCache:
+    """SQLite store of agent responses keyed by a hash of model and prompt
+    
+    Prompts embed the extracted PDF text, so identical attachments (template
+    police reports, standard forms) map to the same key.
+    """
+    
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, content TEXT, created REAL)"
+            )
+            self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - ANALYSIS_CACHE_TTL,))
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning("Agent responses will not be cached: %s", e)
+            self._db = None
+    
+    @staticmethod
+    def key(*fields: str) -> str:
+        """SHA-256 over length-prefixed fields, so no two field lists collide"""
+        digest = hashlib.sha256()
+        for field in fields:
+            data = field.encode('utf-8', errors='replace')
+            digest.update(len(data).to_bytes(8, 'big'))
+            digest.update(data)
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        if self._db is None:
+            return None
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT content FROM responses WHERE key = ? AND created >= ?",
+                    (key, time.time() - ANALYSIS_CACHE_TTL),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.error("Error reading cached agent response: %s", e)
+            return None
+        with self._lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return row[0] if row else None
+    
+    def set(self, key: str, content: str):
+        if self._db is None:
+            return
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, content, created) VALUES (?, ?, ?)",
+                    (key, content, time.time()),
+                )
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.error("Error caching agent response: %s", e)
+
+# Location and attorney lookups remembered per process
+LOOKUP_CACHE_SIZE = 1024
+
+class LookupCache:
+    """Thread-safe in-memory LRU map for repeated location and attorney lookups"""
+    
+    def __init__(self, maxsize: int = LOOKUP_CACHE_SIZE):
+        self._items = OrderedDict()
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+    
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            if len(self._items) > self._maxsize:
+                self._items.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+class PDFTextPool:
+    """Worker processes for CPU-bound PDF text extraction
+    
+    A worker that dies (e.g. a parser crash on a malformed PDF) breaks a
+    ProcessPoolExecutor for good; the next submit replaces the broken pool
+    instead of failing every later extraction.
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        self._max_workers = max_workers or os.cpu_count()
+        self._lock = threading.Lock()
+        self._pool = ProcessPoolExecutor(max_workers=self._max_workers)
+    
+    def submit(self, pdf_path: str) -> Future:
+        with self._lock:
+            try:
+                return self._pool.submit(extract_pdf_text, pdf_path)
+            except BrokenProcessPool:
+                self._restart()
+                return self._pool.submit(extract_pdf_text, pdf_path)
+    
+    def _restart(self):
+        logger.warning("PDF extraction worker died, restarting the process pool")
+        self._pool.shutdown(wait=False)
+        self._pool = ProcessPoolExecutor(max_workers=self._max_workers)
+    
+    def shutdown(self):
+        with self._lock:
+            self._pool.shutdown()
+
+class CaseData(BaseModel):
     """Structure for extracted case data"""
     client_name: Optional[str] = None
     date_of_loss: Optional[str] = None
     accident_type: Optional[str] = None
-    injuries: List[str] = None
-    treatment: List[str] = None
-    medical_providers: List[str] = None
+    injuries: List[str] = Field(default_factory=list)
+    treatment: List[str] = Field(default_factory=list)
+    medical_providers: List[str] = Field(default_factory=list)
     insurance_info: Optional[str] = None
     policy_limits: Optional[str] = None
     liability_info: Optional[str] = None
@@ -59,15 +390,12 @@ class CaseData:
     law_firm: Optional[str] = None
     accident_location: Optional[str] = None
     
-    def __post_init__(self):
-        if self.injuries is None:
-            self.injuries = []
-        if self.treatment is None:
-            self.treatment = []
-        if self.medical_providers is None:
-            self.medical_providers = []
+    @field_validator('injuries', 'treatment', 'medical_providers', mode='before')
+    @classmethod
+    def _none_as_empty(cls, value):
+        return [] if value is None else value
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class LocationAnalysis:
     """Structure for location risk analysis"""
     city: Optional[str] = None
@@ -78,7 +406,7 @@ class LocationAnalysis:
     risk_level: Optional[str] = None
     notes: Optional[str] = None
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class AttorneyVerification:
     """Structure for attorney verification data"""
     name: Optional[str] = None
@@ -89,47 +417,47 @@ class AttorneyVerification:
     firm_verified: bool = False
     notes: Optional[str] = None
 
-@dataclass
-class PoliceReportData:
-    """Structure for extracted police report data"""
+class PoliceReportHeader(BaseModel):
+    """Identifying details of a police report"""
     report_number: Optional[str] = None
     report_date: Optional[str] = None
     incident_date: Optional[str] = None
     incident_time: Optional[str] = None
     location: Optional[str] = None
-    officers: List[str] = None
-    parties_involved: List[str] = None
-    vehicles: List[str] = None
-    violations: List[str] = None
+    officers: List[str] = Field(default_factory=list)
+    parties_involved: List[str] = Field(default_factory=list)
+    vehicles: List[str] = Field(default_factory=list)
+    
+    @field_validator('officers', 'parties_involved', 'vehicles', mode='before')
+    @classmethod
+    def _header_none_as_empty(cls, value):
+        return [] if value is None else value
+
+class PoliceReportNarrative(BaseModel):
+    """Narrative and fault analysis of a police report"""
+    violations: List[str] = Field(default_factory=list)
     narrative: Optional[str] = None
     weather_conditions: Optional[str] = None
     road_conditions: Optional[str] = None
     traffic_control: Optional[str] = None
     damage_assessment: Optional[str] = None
-    injuries_reported: List[str] = None
+    injuries_reported: List[str] = Field(default_factory=list)
     fault_determination: Optional[str] = None
-    witness_statements: List[str] = None
-    citations_issued: List[str] = None
-    towed_vehicles: List[str] = None
+    witness_statements: List[str] = Field(default_factory=list)
+    citations_issued: List[str] = Field(default_factory=list)
+    towed_vehicles: List[str] = Field(default_factory=list)
     property_damage: Optional[str] = None
     
-    def __post_init__(self):
-        if self.officers is None:
-            self.officers = []
-        if self.parties_involved is None:
-            self.parties_involved = []
-        if self.vehicles is None:
-            self.vehicles = []
-        if self.violations is None:
-            self.violations = []
-        if self.injuries_reported is None:
-            self.injuries_reported = []
-        if self.witness_statements is None:
-            self.witness_statements = []
-        if self.citations_issued is None:
-            self.citations_issued = []
-        if self.towed_vehicles is None:
-            self.towed_vehicles = []
+    @field_validator(
+        'violations', 'injuries_reported', 'witness_statements', 'citations_issued',
+        'towed_vehicles', mode='before'
+    )
+    @classmethod
+    def _narrative_none_as_empty(cls, value):
+        return [] if value is None else value
+
+class PoliceReportData(PoliceReportNarrative, PoliceReportHeader):
+    """Structure for extracted police report data"""
 
 class LegalCaseProcessor(EmailPDFAgent):
     """Enhanced Legal Case Processing Agent"""
@@ -138,16 +466,64 @@ class LegalCaseProcessor(EmailPDFAgent):
         """Initialize the Legal Case Processor"""
         super().__init__(config)
         
+        # One HTTP connection pool for all agents' model clients. Connections
+        # open on the first request, and agno builds each SDK client then,
+        # with the API key current at that time.
+        self._http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+        # SDK clients for the batch APIs, keyed on (provider, api_key)
+        self._sdk_clients = {}
+        self._sdk_clients_lock = threading.Lock()
+        
         # Create specialized agents for different tasks
         self.extraction_agent = self._create_extraction_agent()
         self.analysis_agent = self._create_analysis_agent()
         self.location_agent = self._create_location_agent()
         self.attorney_agent = self._create_attorney_agent()
         self.police_report_agent = self._create_police_report_agent()
+        self.police_header_agent = self._create_police_report_agent(
+            PoliceReportHeader, "Police Report Header Extraction Agent"
+        )
+        self.police_narrative_agent = self._create_police_report_agent(
+            PoliceReportNarrative, "Police Report Narrative Extraction Agent"
+        )
         self.multi_report_analyzer = self._create_multi_report_analyzer()
         
+        # PDF text extraction is CPU-bound, so it runs in worker processes
+        self._pdf_pool = PDFTextPool()
+        
+        # Agent responses for repeated prompts
+        self._analysis_cache = AnalysisCache(self.config.get('analysis_cache_db', 'legal_case_cache.db'))
+        # Results for locations and attorneys already seen, keyed case-insensitively
+        self._location_cache = LookupCache()
+        self._attorney_cache = LookupCache()
+        
         logger.info("Legal Case Processor initialized")
     
+    def clear_caches(self):
+        """Forget remembered location and attorney lookups, e.g. in a long-running monitor"""
+        self._location_cache.clear()
+        self._attorney_cache.clear()
+    
+    def shutdown(self):
+        """Stop the PDF worker processes, close the HTTP pool and log response cache statistics"""
+        self._pdf_pool.shutdown()
+        self._http_client.close()
+        logger.info("Agent response cache: %s hits, %s misses",
+                    self._analysis_cache.hits, self._analysis_cache.misses)
+    
+    def _sdk_client(self, provider: str):
+        """SDK client on the shared HTTP pool, created on first use for the current API key"""
+        api_key = os.getenv(PROVIDER_API_KEY_ENV[provider])
+        with self._sdk_clients_lock:
+            client = self._sdk_clients.get((provider, api_key))
+            if client is None:
+                client_class = OpenAI if provider == 'openai' else Anthropic
+                client = client_class(api_key=api_key, http_client=self._http_client)
+                self._sdk_clients[(provider, api_key)] = client
+            return client
+    
     def _create_model(self, max_tokens=4000, temperature=0.1):
         """Create model based on configuration"""
         provider = self.config.get('model_provider', 'openai').lower()
@@ -157,13 +533,17 @@ class LegalCaseProcessor(EmailPDFAgent):
             return OpenAIChat(
                 id=model_name,
                 max_tokens=max_tokens,
-                temperature=temperature
+                temperature=temperature,
+                http_client=self._http_client
             )
         elif provider == 'anthropic':
+            # OpenAI caches repeated prompt prefixes on its own; Claude needs opting in
             return Claude(
                 id=model_name,
                 max_tokens=max_tokens,
-                temperature=temperature
+                temperature=temperature,
+                cache_system_prompt=True,
+                http_client=self._http_client
             )
         elif provider == 'google':
             return Gemini(
@@ -189,6 +569,9 @@ class LegalCaseProcessor(EmailPDFAgent):
                 "Pay special attention to dates, names, medical terms, and financial information.",
                 "Format your response as structured JSON when requested.",
             ],
+            # Enforce the schema at the API level (native structured outputs where supported)
+            response_model=CaseData,
+            structured_outputs=True,
             markdown=True,
         )
         
@@ -254,12 +637,13 @@ class LegalCaseProcessor(EmailPDFAgent):
         
         return agent
     
-    def _create_police_report_agent(self) -> Agent:
-        """Create agent for police report data extraction"""
+    def _create_police_report_agent(self, response_model: type = PoliceReportData,
+                                    name: str = "Police Report Data Extraction Agent") -> Agent:
+        """Create agent for police report data extraction, for all or part of the schema"""
         model = self._create_model(max_tokens=4000, temperature=0.1)
         
         agent = Agent(
-            name="Police Report Data Extraction Agent",
+            name=name,
             model=model,
             instructions=[
                 "You are an expert in extracting and analyzing police report data.",
@@ -270,6 +654,9 @@ class LegalCaseProcessor(EmailPDFAgent):
                 "If information is unclear or missing, note this explicitly.",
                 "Format your response as structured JSON when requested.",
             ],
+            # Enforce the schema at the API level (native structured outputs where supported)
+            response_model=response_model,
+            structured_outputs=True,
             markdown=True,
         )
         
@@ -295,88 +682,132 @@ class LegalCaseProcessor(EmailPDFAgent):
         
         return agent
     
+    def _cache_key(self, agent: Agent, prompt: str) -> str:
+        """Cache key for an agent run: provider, model settings, prompt version, agent and prompt"""
+        model = agent.model
+        return AnalysisCache.key(
+            self.config.get('model_provider', 'openai').lower(), model.id,
+            str(getattr(model, 'temperature', None)), str(getattr(model, 'max_tokens', None)),
+            str(PROMPT_VERSION), agent.name or '', prompt
+        )
+    
+    def _cached_run(self, agent: Agent, prompt: str):
+        """Run an agent, reusing the cached response for an identical prompt
+        
+        Returns the agent's response, or an object with the cached content.
+        """
+        key = self._cache_key(agent, prompt)
+        content = self._analysis_cache.get(key)
+        if content is not None:
+            logger.info("Using cached response from %s", agent.name)
+            return SimpleNamespace(content=content)
+        
+        response = agent.run(prompt)
+        self._cache_response(agent, key, response.content)
+        return response
+    
+    async def _acached_run(self, agent: Agent, prompt: str):
+        """Async version of _cached_run
+        
+        Runs on a copy of the agent, since concurrent runs on one agent would
+        share its per-run state.
+        """
+        key = self._cache_key(agent, prompt)
+        content = self._analysis_cache.get(key)
+        if content is not None:
+            logger.info("Using cached response from %s", agent.name)
+            return SimpleNamespace(content=content)
+        
+        response = await agent.deep_copy().arun(prompt)
+        self._cache_response(agent, key, response.content)
+        return response
+    
+    def _cached_stream_run(self, agent: Agent, prompt: str) -> str:
+        """Like _cached_run, but streams the response and returns its text
+        
+        For long free-text analyses, where the first tokens arrive well
+        before the full response.
+        """
+        key = self._cache_key(agent, prompt)
+        content = self._analysis_cache.get(key)
+        if content is not None:
+            logger.info("Using cached response from %s", agent.name)
+            return content
+        
+        started = time.monotonic()
+        chunks = []
+        for chunk in agent.run(prompt, stream=True):
+            if not chunk.content:
+                continue
+            if not chunks:
+                logger.info("First tokens from %s after %.1fs", agent.name, time.monotonic() - started)
+            chunks.append(chunk.content)
+        
+        content = ''.join(chunks)
+        self._cache_response(agent, key, content)
+        return content
+    
+    def _cache_response(self, agent: Agent, key: str, content):
+        """Cache a response; structured agents only cache content that parsed into their model"""
+        if isinstance(content, BaseModel):
+            self._analysis_cache.set(key, content.model_dump_json())
+        elif content and agent.response_model is None:
+            self._analysis_cache.set(key, content)
+    
+    @staticmethod
+    def _validate_structured(model: type, content) -> BaseModel:
+        """Return content as an instance of model, parsing JSON text if needed"""
+        if isinstance(content, model):
+            return content
+        if not isinstance(content, str):
+            raise ValueError(f"Expected {model.__name__}, got {type(content).__name__}")
+        return model.model_validate_json(_find_json_object(content) or content)
+    
+    def _run_structured(self, agent: Agent, prompt: str) -> BaseModel:
+        """Run a structured-output agent, re-prompting with the validation error on failure"""
+        request = prompt
+        for attempt in range(STRUCTURED_OUTPUT_RETRIES + 1):
+            try:
+                return self._validate_structured(agent.response_model, self._cached_run(agent, request).content)
+            except (ValidationError, ValueError) as e:
+                if attempt == STRUCTURED_OUTPUT_RETRIES:
+                    raise
+                logger.warning("Invalid response from %s, retrying: %s", agent.name, e)
+                request = f"{prompt}\n\nYour output had error: {e}. Fix and retry."
+                time.sleep(1.0 * (attempt + 1))
+    
+    async def _arun_structured(self, agent: Agent, prompt: str) -> BaseModel:
+        """Async version of _run_structured"""
+        request = prompt
+        for attempt in range(STRUCTURED_OUTPUT_RETRIES + 1):
+            try:
+                response = await self._acached_run(agent, request)
+                return self._validate_structured(agent.response_model, response.content)
+            except (ValidationError, ValueError) as e:
+                if attempt == STRUCTURED_OUTPUT_RETRIES:
+                    raise
+                logger.warning("Invalid response from %s, retrying: %s", agent.name, e)
+                request = f"{prompt}\n\nYour output had error: {e}. Fix and retry."
+                await asyncio.sleep(1.0 * (attempt + 1))
+    
     def extract_case_data(self, text_content: str, email_body: str = "") -> CaseData:
         """Extract structured case data from PDF content and email"""
         try:
             logger.info("Extracting case data from documents")
             
-            # Combine PDF content and email body
-            full_content = f"""
-            EMAIL BODY:
-            {email_body}
-            
-            PDF CONTENT:
-            {text_content}
-            """
-            
-            extraction_prompt = f"""
-            Please extract the following case information from the provided content and format as JSON:
-            
-            {{
-                "client_name": "Name of the injured party/claimant",
-                "date_of_loss": "Date when accident/incident occurred",
-                "accident_type": "Type of accident (auto, slip/fall, etc.)",
-                "injuries": ["List of specific injuries mentioned"],
-                "treatment": ["List of medical treatments received"],
-                "medical_providers": ["Names of doctors, hospitals, clinics"],
-                "insurance_info": "Insurance company and coverage details",
-                "policy_limits": "Policy limits if mentioned",
-                "liability_info": "Liability/fault information",
-                "attorney_name": "Name of the attorney/lawyer",
-                "attorney_email": "Email address of attorney",
-                "law_firm": "Name of law firm",
-                "accident_location": "Location where accident occurred"
-            }}
-            
-            Content to analyze:
-            {full_content}
-            
-            Important: Only include information that is explicitly stated. Use null for missing information.
-            """
-            
-            response = self.extraction_agent.run(extraction_prompt)
+            extraction_prompt = self._case_data_prompt(text_content, email_body)
             
-            # Parse JSON from response
-            try:
-                # Extract JSON from response text
-                json_match = re.search(r'\{.*\}', response.content, re.DOTALL)
-                if json_match:
-                    data_dict = json.loads(json_match.group())
-                    case_data = CaseData(**data_dict)
-                else:
-                    # Fallback: create case data from text analysis
-                    case_data = self._parse_case_data_from_text(response.content)
-                
-                logger.info(f"Successfully extracted case data for client: {case_data.client_name}")
-                return case_data
-                
-            except json.JSONDecodeError:
-                logger.warning("Failed to parse JSON, using text-based extraction")
-                return self._parse_case_data_from_text(response.content)
+            case_data = self._run_structured(self.extraction_agent, extraction_prompt)
+            logger.info("Successfully extracted case data for client: %s", case_data.client_name)
+            return case_data
                 
         except Exception as e:
-            logger.error(f"Error extracting case data: {e}")
+            logger.error("Error extracting case data: %s", e)
             return CaseData()
     
-    def _parse_case_data_from_text(self, text: str) -> CaseData:
-        """Fallback method to parse case data from text"""
-        case_data = CaseData()
-        
-        # Simple regex patterns for common information
-        patterns = {
-            'client_name': r'(?:client|claimant|plaintiff):\s*([^\n]+)',
-            'date_of_loss': r'(?:date of loss|accident date|incident date):\s*([^\n]+)',
-            'accident_type': r'(?:accident type|incident type):\s*([^\n]+)',
-            'attorney_name': r'(?:attorney|lawyer):\s*([^\n]+)',
-            'attorney_email': r'(?:email|e-mail):\s*([^\s@]+@[^\s@]+\.[^\s@]+)',
-        }
-        
-        for field, pattern in patterns.items():
-            match = re.search(pattern, text.lower())
-            if match:
-                setattr(case_data, field, match.group(1).strip())
-        
-        return case_data
+    @staticmethod
+    def _case_data_prompt(text_content: str, email_body: str) -> str:
+        return f"{CASE_DATA_PROMPT}\nEMAIL BODY:\n{email_body}\n\nPDF CONTENT:\n{_truncate_middle(text_content)}\n"
     
     def identify_missing_information(self, case_data: CaseData) -> List[str]:
         """Identify gaps in case information and generate follow-up questions"""
@@ -407,20 +838,19 @@ class LegalCaseProcessor(EmailPDFAgent):
             Focus on information essential for underwriting decisions.
             """
             
-            response = self.analysis_agent.run(analysis_prompt)
+            response = self._cached_run(self.analysis_agent, analysis_prompt)
             
             # Extract missing items from response
-            missing_items = []
-            lines = response.content.split('\n')
-            for line in lines:
-                if line.strip().startswith('•') or line.strip().startswith('-') or line.strip().startswith('*'):
-                    missing_items.append(line.strip())
+            missing_items = [
+                line.strip() for line in response.content.splitlines()
+                if line.lstrip()[:1] in BULLET_CHARS
+            ]
             
-            logger.info(f"Identified {len(missing_items)} missing information items")
+            logger.info("Identified %s missing information items", len(missing_items))
             return missing_items
             
         except Exception as e:
-            logger.error(f"Error analyzing missing information: {e}")
+            logger.error("Error analyzing missing information: %s", e)
             return ["Error analyzing case completeness"]
     
     def analyze_location_risk(self, location: str) -> LocationAnalysis:
@@ -428,8 +858,13 @@ class LegalCaseProcessor(EmailPDFAgent):
         try:
             if not location:
                 return LocationAnalysis()
+            
+            cache_key = ' '.join(location.split()).lower()
+            cached = self._location_cache.get(cache_key)
+            if cached is not None:
+                return replace(cached)
                 
-            logger.info(f"Analyzing location risk for: {location}")
+            logger.info("Analyzing location risk for: %s", location)
             
             location_prompt = f"""
             Analyze the legal/tort environment for the following location: {location}
@@ -445,24 +880,24 @@ class LegalCaseProcessor(EmailPDFAgent):
             Format your response with clear sections and risk level assessment.
             """
             
-            response = self.location_agent.run(location_prompt)
+            response = self._cached_run(self.location_agent, location_prompt)
             
             # Parse response into LocationAnalysis
             analysis = LocationAnalysis()
-            content = response.content.lower()
+            content = response.content
             
             # Extract key information
-            if 'liberal' in content or 'democrat' in content:
+            if LIBERAL_RE.search(content):
                 analysis.political_leaning = 'Liberal'
-            elif 'conservative' in content or 'republican' in content:
+            elif CONSERVATIVE_RE.search(content):
                 analysis.political_leaning = 'Conservative'
             else:
                 analysis.political_leaning = 'Mixed/Neutral'
             
-            if 'tort-friendly' in content or 'plaintiff-friendly' in content:
+            if TORT_FRIENDLY_RE.search(content):
                 analysis.tort_environment = 'Tort-Friendly'
                 analysis.risk_level = 'High'
-            elif 'tort-hostile' in content or 'defense-friendly' in content:
+            elif TORT_HOSTILE_RE.search(content):
                 analysis.tort_environment = 'Tort-Hostile'
                 analysis.risk_level = 'Low'
             else:
@@ -470,29 +905,43 @@ class LegalCaseProcessor(EmailPDFAgent):
                 analysis.risk_level = 'Medium'
             
             # Parse location components
-            location_parts = location.split(',')
-            if len(location_parts) >= 2:
-                analysis.city = location_parts[0].strip()
-                analysis.state = location_parts[-1].strip()
-                if len(location_parts) >= 3:
-                    analysis.county = location_parts[1].strip()
+            analysis.city, analysis.county, analysis.state = self._split_location(location)
             
-            analysis.notes = response.content
+            analysis.notes = content
             
-            logger.info(f"Location analysis complete: {analysis.risk_level} risk")
+            logger.info("Location analysis complete: %s risk", analysis.risk_level)
+            self._location_cache.set(cache_key, replace(analysis))
             return analysis
             
         except Exception as e:
-            logger.error(f"Error analyzing location risk: {e}")
+            logger.error("Error analyzing location risk: %s", e)
             return LocationAnalysis(notes=f"Error analyzing location: {e}")
     
+    @staticmethod
+    def _split_location(location: Optional[str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """City, county and state from a "City, [County,] State" location"""
+        location_parts = (location or '').split(',')
+        if len(location_parts) < 2:
+            return None, None, None
+        county = location_parts[1].strip() if len(location_parts) >= 3 else None
+        return location_parts[0].strip(), county, location_parts[-1].strip()
+    
     def verify_attorney(self, attorney_name: str, attorney_email: str, state: str = None) -> AttorneyVerification:
         """Verify attorney credentials and legitimacy"""
         try:
             if not attorney_name:
                 return AttorneyVerification()
+            
+            cache_key = (
+                ' '.join(attorney_name.split()).lower(),
+                (attorney_email or '').strip().lower(),
+                (state or '').strip().upper()
+            )
+            cached = self._attorney_cache.get(cache_key)
+            if cached is not None:
+                return replace(cached)
                 
-            logger.info(f"Verifying attorney: {attorney_name}")
+            logger.info("Verifying attorney: %s", attorney_name)
             
             verification_prompt = f"""
             Analyze the following attorney information for legitimacy and professional standing:
@@ -511,7 +960,7 @@ class LegalCaseProcessor(EmailPDFAgent):
             Note: This is for general analysis only, not actual bar database lookup.
             """
             
-            response = self.attorney_agent.run(verification_prompt)
+            response = self._cached_run(self.attorney_agent, verification_prompt)
             
             verification = AttorneyVerification()
             verification.name = attorney_name
@@ -520,8 +969,8 @@ class LegalCaseProcessor(EmailPDFAgent):
             
             # Simple email verification
             if attorney_email:
-                domain = attorney_email.split('@')[-1] if '@' in attorney_email else ''
-                if domain and not domain.endswith(('.gmail.com', '.yahoo.com', '.hotmail.com')):
+                domain = attorney_email.rpartition('@')[2].strip().lower() if '@' in attorney_email else ''
+                if domain and domain not in FREE_EMAIL_DOMAINS:
                     verification.email_verified = True
                     verification.firm_verified = True
             
@@ -534,101 +983,264 @@ class LegalCaseProcessor(EmailPDFAgent):
             else:
                 verification.bar_status = 'Unknown'
             
-            logger.info(f"Attorney verification complete: {verification.bar_status}")
+            logger.info("Attorney verification complete: %s", verification.bar_status)
+            self._attorney_cache.set(cache_key, replace(verification))
             return verification
             
         except Exception as e:
-            logger.error(f"Error verifying attorney: {e}")
+            logger.error("Error verifying attorney: %s", e)
             return AttorneyVerification(notes=f"Error verifying attorney: {e}")
     
     def extract_police_report_data(self, text_content: str) -> PoliceReportData:
         """Extract structured police report data from text content"""
+        return asyncio.run(self.aextract_police_report_data(text_content))
+    
+    async def aextract_police_report_data(self, text_content: str) -> PoliceReportData:
+        """Extract structured police report data from text content
+        
+        The header and narrative halves of the schema are extracted by two
+        concurrent calls; if one fails, the other half is still returned.
+        """
+        logger.info("Extracting police report data from text content")
+        parts = await asyncio.gather(
+            self._arun_structured(
+                self.police_header_agent, self._police_report_prompt(text_content, POLICE_HEADER_PROMPT)
+            ),
+            self._arun_structured(
+                self.police_narrative_agent, self._police_report_prompt(text_content, POLICE_NARRATIVE_PROMPT)
+            ),
+            return_exceptions=True
+        )
+        
+        fields = {}
+        for part in parts:
+            if isinstance(part, Exception):
+                logger.error("Error extracting police report data: %s", part)
+            else:
+                fields.update(part.model_dump())
+        
+        if len(fields) == len(PoliceReportData.model_fields):
+            logger.info("Successfully extracted police report data")
+        return PoliceReportData(**fields)
+    
+    @staticmethod
+    def _police_report_prompt(text_content: str, prompt: str = POLICE_REPORT_PROMPT) -> str:
+        return f"{prompt}\nText to analyze:\n{_truncate_middle(text_content)}\n"
+    
+    def process_multiple_police_reports(self, text_contents: List[str]) -> List[PoliceReportData]:
+        """Process multiple police reports and extract data from each"""
+        return asyncio.run(self.aprocess_multiple_police_reports(text_contents))
+    
+    async def aprocess_multiple_police_reports(self, text_contents: List[str]) -> List[PoliceReportData]:
+        """Extract data from multiple police reports concurrently
+        
+        At most max_concurrent_llm extraction calls are in flight at once.
+        Reports whose text differs only in whitespace are extracted once.
+        """
         try:
-            logger.info("Extracting police report data from text content")
-            
-            extraction_prompt = f"""
-            Please extract the following police report information from the provided text and format as JSON:
-            
-            {{
-                "report_number": "Report number of the police report",
-                "report_date": "Date when the report was filed",
-                "incident_date": "Date when the incident occurred",
-                "incident_time": "Time when the incident occurred",
-                "location": "Location of the incident",
-                "officers": ["List of officers mentioned in the report"],
-                "parties_involved": ["List of parties involved in the incident"],
-                "vehicles": ["List of vehicles involved"],
-                "violations": ["List of violations or charges"],
-                "narrative": "Narrative description of the incident",
-                "weather_conditions": "Weather conditions at the time of the incident",
-                "road_conditions": "Road conditions at the time of the incident",
-                "traffic_control": "Traffic control measures in place",
-                "damage_assessment": "Assessment of damages",
-                "injuries_reported": ["List of reported injuries"],
-                "fault_determination": "Determination of fault or liability",
-                "witness_statements": ["List of witness statements"],
-                "citations_issued": ["List of citations issued"],
-                "towed_vehicles": ["List of towed vehicles"],
-                "property_damage": "Description of property damage"
-            }}
-            
-            Text to analyze:
-            {text_content}
-            
-            Important: Only include information that is explicitly stated. Use null for missing information.
-            """
-            
-            response = self.extraction_agent.run(extraction_prompt)
+            logger.info("Processing %s police reports", len(text_contents))
+            semaphore = asyncio.Semaphore(self.config.get('max_concurrent_llm', 8))
+            
+            # Position in `unique` of the first report with each normalized text
+            normalized = [' '.join(text_content.split()) for text_content in text_contents]
+            first_index = {}
+            unique = []
+            for i, text in enumerate(normalized):
+                if text not in first_index:
+                    first_index[text] = len(unique)
+                    unique.append(i)
+            if len(unique) < len(text_contents):
+                logger.info("Skipping %s duplicate police reports", len(text_contents) - len(unique))
+            
+            async def extract(i: int) -> PoliceReportData:
+                async with semaphore:
+                    logger.info("Processing police report %s of %s", i+1, len(text_contents))
+                    return await self.aextract_police_report_data(text_contents[i])
+            
+            extracted = await asyncio.gather(*(extract(i) for i in unique))
+            reports = [extracted[first_index[text]].model_copy(deep=True) for text in normalized]
+            
+            logger.info("Successfully processed %s police reports", len(reports))
+            return reports
             
-            # Parse JSON from response
-            try:
-                # Extract JSON from response text
-                json_match = re.search(r'\{.*\}', response.content, re.DOTALL)
-                if json_match:
-                    data_dict = json.loads(json_match.group())
-                    police_report_data = PoliceReportData(**data_dict)
-                else:
-                    logger.warning("No JSON object found in response")
-                    police_report_data = PoliceReportData()
-                
-                logger.info("Successfully extracted police report data")
-                return police_report_data
-                
-            except json.JSONDecodeError:
-                logger.error("Failed to parse JSON from police report data extraction")
-                return PoliceReportData()
-                
         except Exception as e:
-            logger.error(f"Error extracting police report data: {e}")
-            return PoliceReportData()
+            logger.error("Error processing multiple police reports: %s", e)
+            return []
     
-    def process_multiple_police_reports(self, text_contents: List[str]) -> List[PoliceReportData]:
-        """Process multiple police reports and extract data from each"""
+    def process_multiple_police_reports_batch(self, text_contents: List[str],
+                                              mode: str = 'interactive') -> List[PoliceReportData]:
+        """Process multiple police reports, optionally through the provider's batch API
+        
+        mode='interactive' is process_multiple_police_reports. mode='batch'
+        submits all uncached extractions as one OpenAI or Anthropic batch job,
+        which costs about half as much but can take up to 24 hours.
+        """
+        if mode == 'interactive':
+            return self.process_multiple_police_reports(text_contents)
+        if mode != 'batch':
+            raise ValueError(f"Unsupported mode: {mode}")
+        
         try:
-            logger.info(f"Processing {len(text_contents)} police reports")
+            logger.info("Processing %s police reports as a batch job", len(text_contents))
+            prompts = [self._police_report_prompt(text_content) for text_content in text_contents]
+            keys = [self._cache_key(self.police_report_agent, prompt) for prompt in prompts]
+            contents = [self._analysis_cache.get(key) for key in keys]
+            
+            pending = [i for i, content in enumerate(contents) if content is None]
+            if pending:
+                provider = self.config.get('model_provider', 'openai').lower()
+                if provider == 'openai':
+                    results = self._run_openai_batch([prompts[i] for i in pending])
+                elif provider == 'anthropic':
+                    results = self._run_anthropic_batch(
+                        [prompts[i] for i in pending], cached_prefix=POLICE_REPORT_PROMPT
+                    )
+                else:
+                    raise ValueError(f"Batch mode is not supported for model provider: {provider}")
+                
+                for i, content in zip(pending, results):
+                    contents[i] = content
             
             reports = []
-            for i, text_content in enumerate(text_contents):
-                logger.info(f"Processing police report {i+1} of {len(text_contents)}")
-                report_data = self.extract_police_report_data(text_content)
-                reports.append(report_data)
-            
-            logger.info(f"Successfully processed {len(reports)} police reports")
+            for i, content in enumerate(contents):
+                if content is None:
+                    logger.warning("No batch result for police report %s", i+1)
+                    reports.append(PoliceReportData())
+                    continue
+                try:
+                    report = self._validate_structured(PoliceReportData, content)
+                except (ValidationError, ValueError) as e:
+                    logger.error("Invalid batch result for police report %s: %s", i+1, e)
+                    reports.append(PoliceReportData())
+                    continue
+                if i in pending:
+                    self._analysis_cache.set(keys[i], report.model_dump_json())
+                reports.append(report)
+            
+            logger.info("Successfully processed %s police reports", len(reports))
             return reports
             
         except Exception as e:
-            logger.error(f"Error processing multiple police reports: {e}")
+            logger.error("Error processing police reports as a batch job: %s", e)
             return []
     
+    def _batch_request_params(self) -> Dict[str, Any]:
+        """Model settings and system prompt of the extraction agent, for batch requests"""
+        model = self.police_report_agent.model
+        return {
+            'model': model.id,
+            'max_tokens': model.max_tokens,
+            'temperature': model.temperature,
+            'system': "\n".join(self.police_report_agent.instructions),
+        }
+    
+    def _run_openai_batch(self, prompts: List[str]) -> List[Optional[str]]:
+        """Run chat completions through the OpenAI Batch API, in prompt order"""
+        params = self._batch_request_params()
+        lines = []
+        for i, prompt in enumerate(prompts):
+            lines.append(json.dumps({
+                "custom_id": f"report_{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": params['model'],
+                    "max_tokens": params['max_tokens'],
+                    "temperature": params['temperature'],
+                    "response_format": {"type": "json_object"},
+                    "messages": [
+                        {"role": "system", "content": params['system']},
+                        {"role": "user", "content": prompt},
+                    ],
+                },
+            }))
+        
+        client = self._sdk_client('openai')
+        batch_file = client.files.create(
+            file=("police_reports.jsonl", "\n".join(lines).encode('utf-8')), purpose="batch"
+        )
+        batch = client.batches.create(
+            input_file_id=batch_file.id, endpoint="/v1/chat/completions", completion_window="24h"
+        )
+        logger.info("Submitted OpenAI batch %s with %s requests", batch.id, len(prompts))
+        
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(BATCH_POLL_SECONDS)
+            batch = client.batches.retrieve(batch.id)
+        if batch.status != "completed":
+            raise RuntimeError(f"OpenAI batch {batch.id} ended with status {batch.status}")
+        
+        results = {}
+        if batch.output_file_id:
+            for line in client.files.content(batch.output_file_id).text.splitlines():
+                result = json.loads(line)
+                response = result.get('response') or {}
+                if response.get('status_code') == 200:
+                    results[result['custom_id']] = response['body']['choices'][0]['message']['content']
+        return [results.get(f"report_{i}") for i in range(len(prompts))]
+    
+    def _run_anthropic_batch(self, prompts: List[str], cached_prefix: str = "") -> List[Optional[str]]:
+        """Run messages through the Anthropic Message Batches API, in prompt order
+        
+        The system prompt and a shared cached_prefix of the prompts are marked
+        for prompt caching, so only the rest of each prompt is billed in full.
+        """
+        params = self._batch_request_params()
+        cache_control = {"type": "ephemeral"}
+        
+        def content(prompt: str) -> List[Dict[str, Any]]:
+            if not cached_prefix or not prompt.startswith(cached_prefix):
+                return [{"type": "text", "text": prompt}]
+            return [
+                {"type": "text", "text": cached_prefix, "cache_control": cache_control},
+                {"type": "text", "text": prompt[len(cached_prefix):]},
+            ]
+        
+        tool = {
+            "name": "record_police_report",
+            "description": "Record the extracted police report data",
+            "input_schema": PoliceReportData.model_json_schema(),
+        }
+        
+        client = self._sdk_client('anthropic')
+        batch = client.messages.batches.create(requests=[
+            {
+                "custom_id": f"report_{i}",
+                "params": {
+                    "model": params['model'],
+                    "max_tokens": params['max_tokens'],
+                    "temperature": params['temperature'],
+                    "system": [{"type": "text", "text": params['system'], "cache_control": cache_control}],
+                    "messages": [{"role": "user", "content": content(prompt)}],
+                    # A forced tool call makes the API return input matching the schema
+                    "tools": [tool],
+                    "tool_choice": {"type": "tool", "name": tool['name']},
+                },
+            }
+            for i, prompt in enumerate(prompts)
+        ])
+        logger.info("Submitted Anthropic batch %s with %s requests", batch.id, len(prompts))
+        
+        while batch.processing_status != "ended":
+            time.sleep(BATCH_POLL_SECONDS)
+            batch = client.messages.batches.retrieve(batch.id)
+        
+        results = {}
+        for entry in client.messages.batches.results(batch.id):
+            if entry.result.type == "succeeded":
+                for block in entry.result.message.content:
+                    if block.type == "tool_use":
+                        results[entry.custom_id] = json.dumps(block.input)
+        return [results.get(f"report_{i}") for i in range(len(prompts))]
+    
     def analyze_multiple_reports(self, case_data: CaseData, police_reports: List[PoliceReportData]) -> Dict[str, Any]:
         """Analyze multiple police reports and provide consolidated insights"""
         try:
-            logger.info(f"Analyzing {len(police_reports)} police reports for consistency and insights")
+            logger.info("Analyzing %s police reports for consistency and insights", len(police_reports))
             
             # Create summary of all reports
-            reports_summary = []
-            for i, report in enumerate(police_reports):
-                summary = {
+            reports_summary = [
+                {
                     "report_number": report.report_number,
                     "incident_date": report.incident_date,
                     "location": report.location,
@@ -636,97 +1248,114 @@ class LegalCaseProcessor(EmailPDFAgent):
                     "fault_determination": report.fault_determination,
                     "violations": report.violations,
                     "injuries_reported": report.injuries_reported,
-                    "narrative_snippet": report.narrative[:200] + "..." if report.narrative and len(report.narrative) > 200 else report.narrative
+                    "narrative_snippet": self._snippet(report.narrative, 200)
                 }
-                reports_summary.append(summary)
-            
-            analysis_prompt = f"""
-            Analyze the following multiple police reports for a legal case and provide comprehensive insights:
-            
-            Case Information:
-            - Client: {case_data.client_name}
-            - Accident Type: {case_data.accident_type}
-            - Date of Loss: {case_data.date_of_loss}
-            
-            Police Reports Summary:
-            {json.dumps(reports_summary, indent=2)}
-            
-            Please provide a detailed analysis covering:
-            
-            1. **Consistency Analysis**: Are the reports consistent with each other? Any discrepancies in facts, dates, locations, or fault determinations?
-            
-            2. **Fault and Liability**: What do the reports indicate about fault and liability? Are there clear patterns or conflicting assessments?
-            
-            3. **Injury Correlation**: How do reported injuries in police reports align with the case medical information?
-            
-            4. **Key Evidence**: What are the most important pieces of evidence from these reports?
-            
-            5. **Red Flags**: Any concerning inconsistencies, missing information, or suspicious patterns?
-            
-            6. **Overall Assessment**: How do these reports strengthen or weaken the case?
-            
-            7. **Recommendations**: What additional information or clarification should be requested?
-            
-            Format your response with clear headings and bullet points for easy reading.
-            """
+                for report in police_reports
+            ]
+            
+            analysis_prompt = (
+                f"{MULTI_REPORT_PROMPT}\n"
+                "Case Information:\n"
+                f"- Client: {case_data.client_name}\n"
+                f"- Accident Type: {case_data.accident_type}\n"
+                f"- Date of Loss: {case_data.date_of_loss}\n\n"
+                "Police Reports Summary:\n"
+                f"{json.dumps(reports_summary, separators=(',', ':'), ensure_ascii=False)}\n"
+            )
             
-            response = self.multi_report_analyzer.run(analysis_prompt)
+            analysis = self._cached_stream_run(self.multi_report_analyzer, analysis_prompt)
+            key_findings, recommendations = self._extract_sections(analysis)
             
             # Create structured analysis result
             analysis_result = {
                 "number_of_reports": len(police_reports),
                 "reports_analyzed": [r.report_number for r in police_reports if r.report_number],
-                "analysis": response.content,
-                "key_findings": self._extract_key_findings(response.content),
+                "analysis": analysis,
+                "key_findings": key_findings,
                 "consistency_score": self._assess_consistency(police_reports),
-                "recommendations": self._extract_recommendations(response.content)
+                "recommendations": recommendations
             }
             
             logger.info("Multi-report analysis completed")
             return analysis_result
             
         except Exception as e:
-            logger.error(f"Error analyzing multiple reports: {e}")
+            logger.error("Error analyzing multiple reports: %s", e)
             return {
                 "number_of_reports": len(police_reports),
                 "error": str(e),
                 "analysis": "Error occurred during analysis"
             }
     
-    def _extract_key_findings(self, analysis_text: str) -> List[str]:
-        """Extract key findings from analysis text"""
+    @staticmethod
+    def _snippet(text: Optional[str], limit: int) -> Optional[str]:
+        """Text cut to limit characters with '...' appended when longer"""
+        if text is None or len(text) <= limit:
+            return text
+        return text[:limit] + "..."
+    
+    def _extract_sections(self, analysis_text: str) -> Tuple[List[str], List[str]]:
+        """Extract key findings and recommendations from analysis text in one pass
+        
+        A heading mentioning either opens that section; any other heading
+        closes it. Returns the top 5 findings and top 3 recommendations.
+        """
         findings = []
-        lines = analysis_text.split('\n')
+        recommendations = []
         
         in_key_section = False
-        for line in lines:
+        in_rec_section = False
+        for line in analysis_text.splitlines():
             line = line.strip()
-            if any(keyword in line.lower() for keyword in ['key evidence', 'important', 'critical', 'red flag']):
+            is_heading = line.startswith('#')
+            is_bullet = line.startswith('-')
+            
+            if KEY_FINDING_RE.search(line):
                 in_key_section = True
-            elif line.startswith('##') or line.startswith('#'):
+            elif is_heading:
                 in_key_section = False
-            elif in_key_section and line.startswith('-'):
+            elif in_key_section and is_bullet:
                 findings.append(line[1:].strip())
+            
+            if RECOMMENDATION_RE.search(line):
+                in_rec_section = True
+            elif is_heading:
+                in_rec_section = False
+            elif in_rec_section and is_bullet:
+                recommendations.append(line[1:].strip())
         
-        return findings[:5]  # Return top 5 findings
+        return findings[:5], recommendations[:3]
     
     def _assess_consistency(self, police_reports: List[PoliceReportData]) -> str:
         """Assess consistency across multiple police reports"""
         if len(police_reports) < 2:
             return "Single report - consistency assessment not applicable"
         
-        # Check consistency of key fields
-        incident_dates = set(r.incident_date for r in police_reports if r.incident_date)
-        locations = set(r.location for r in police_reports if r.location)
-        fault_determinations = set(r.fault_determination for r in police_reports if r.fault_determination)
+        # Check consistency of key fields: a field is inconsistent once a second
+        # distinct non-empty value turns up, after which it is no longer compared
+        fields = ('incident_date', 'location', 'fault_determination')
+        first_values = [None, None, None]
+        inconsistent = [False, False, False]
+        for r in police_reports:
+            for i, field in enumerate(fields):
+                if inconsistent[i]:
+                    continue
+                value = getattr(r, field)
+                if not value:
+                    continue
+                if first_values[i] is None:
+                    first_values[i] = value
+                elif value != first_values[i]:
+                    inconsistent[i] = True
+            if all(inconsistent):
+                break
         
-        inconsistencies = []
-        if len(incident_dates) > 1:
-            inconsistencies.append("incident dates")
-        if len(locations) > 1:
-            inconsistencies.append("locations")
-        if len(fault_determinations) > 1:
-            inconsistencies.append("fault determinations")
+        inconsistencies = [
+            label for label, flagged in zip(
+                ("incident dates", "locations", "fault determinations"), inconsistent
+            )
+            if flagged
+        ]
         
         if not inconsistencies:
             return "High - All key fields are consistent"
@@ -735,53 +1364,23 @@ class LegalCaseProcessor(EmailPDFAgent):
         else:
             return f"Low - Multiple inconsistencies in: {', '.join(inconsistencies)}"
     
-    def _extract_recommendations(self, analysis_text: str) -> List[str]:
-        """Extract recommendations from analysis text"""
-        recommendations = []
-        lines = analysis_text.split('\n')
-        
-        in_rec_section = False
-        for line in lines:
-            line = line.strip()
-            if 'recommendation' in line.lower():
-                in_rec_section = True
-            elif line.startswith('##') or line.startswith('#'):
-                in_rec_section = False
-            elif in_rec_section and line.startswith('-'):
-                recommendations.append(line[1:].strip())
-        
-        return recommendations[:3]  # Return top 3 recommendations
-
     def _identify_separate_reports(self, content: str) -> List[str]:
-        """Identify and separate multiple police reports in content"""
-        # Look for report separators
-        separators = [
-            'POLICE REPORT',
-            'INCIDENT REPORT', 
-            'ACCIDENT REPORT',
-            'REPORT NUMBER',
-            'REPORT #'
-        ]
-        
-        reports = []
-        lines = content.split('\n')
-        current_report = []
+        """Identify and separate multiple police reports in content
         
-        for line in lines:
-            line_upper = line.upper()
-            if any(sep in line_upper for sep in separators) and current_report:
-                # Found a new report, save the current one
-                reports.append('\n'.join(current_report))
-                current_report = [line]
-            else:
-                current_report.append(line)
-        
-        # Add the last report
-        if current_report:
-            reports.append('\n'.join(current_report))
+        Slices content at each separator line rather than splitting it into
+        lines and joining them back together.
+        """
+        # A separator on the first line does not start a second report
+        starts = [0] + [m.start() for m in REPORT_SEPARATOR_RE.finditer(content) if m.start() > 0]
+        if len(starts) == 1:
+            return [content]
+        ends = [start - 1 for start in starts[1:]] + [len(content)]  # drop the newline before each separator
         
         # Filter out very short "reports" (likely false positives)
-        reports = [report for report in reports if len(report.split()) > 50]
+        reports = [
+            content[start:end] for start, end in zip(starts, ends)
+            if next(islice(WORD_RE.finditer(content, start, end), MIN_REPORT_WORDS, None), None) is not None
+        ]
         
         return reports if len(reports) > 1 else [content]
 
@@ -795,6 +1394,13 @@ class LegalCaseProcessor(EmailPDFAgent):
         try:
             logger.info("Generating comprehensive case report")
             
+            police_report_data = police_report_data or PoliceReportData()
+            # Three bullet slots each, padded; the first shows a placeholder when there are none
+            key_findings = (multi_report_analysis or {}).get('key_findings') or ['No key findings']
+            key_findings = (key_findings + ['', ''])[:3]
+            recommendations = (multi_report_analysis or {}).get('recommendations') or ['No recommendations']
+            recommendations = (recommendations + ['', ''])[:3]
+            
             report = f"""
 # Case Summary: {case_data.client_name or 'Unknown Client'} | {case_data.accident_type or 'Unknown Incident'} | {location_analysis.city or 'Unknown Location'}
 
@@ -891,21 +1497,21 @@ Here's a comprehensive analysis of the forwarded case email:
 {multi_report_analysis['analysis'] if multi_report_analysis else 'No multi-report analysis performed'}
 
 **Key Findings:**
-- {multi_report_analysis['key_findings'][0] if multi_report_analysis and 'key_findings' in multi_report_analysis and len(multi_report_analysis['key_findings']) > 0 else 'No key findings'}
-- {multi_report_analysis['key_findings'][1] if multi_report_analysis and 'key_findings' in multi_report_analysis and len(multi_report_analysis['key_findings']) > 1 else ''}
-- {multi_report_analysis['key_findings'][2] if multi_report_analysis and 'key_findings' in multi_report_analysis and len(multi_report_analysis['key_findings']) > 2 else ''}
+- {key_findings[0]}
+- {key_findings[1]}
+- {key_findings[2]}
 
 **Consistency Score:** {multi_report_analysis['consistency_score'] if multi_report_analysis else 'N/A'}
 
 **Recommendations:**
-- {multi_report_analysis['recommendations'][0] if multi_report_analysis and 'recommendations' in multi_report_analysis and len(multi_report_analysis['recommendations']) > 0 else 'No recommendations'}
-- {multi_report_analysis['recommendations'][1] if multi_report_analysis and 'recommendations' in multi_report_analysis and len(multi_report_analysis['recommendations']) > 1 else ''}
-- {multi_report_analysis['recommendations'][2] if multi_report_analysis and 'recommendations' in multi_report_analysis and len(multi_report_analysis['recommendations']) > 2 else ''}
+- {recommendations[0]}
+- {recommendations[1]}
+- {recommendations[2]}
 
 *For detailed multi-report analysis, refer to the attached document.*
 
 ---
-*Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}*
+*Report generated on {_report_timestamp(int(time.time()))}*
 *Original Email: {original_subject} from {original_sender}*
             """
             
@@ -913,14 +1519,14 @@ Here's a comprehensive analysis of the forwarded case email:
             return report
             
         except Exception as e:
-            logger.error(f"Error generating comprehensive report: {e}")
+            logger.error("Error generating comprehensive report: %s", e)
             return f"Error generating report: {e}"
     
     def _format_list_section(self, items: List[str], default_text: str) -> str:
         """Format a list section for the report"""
         if not items:
             return default_text
-        return '\n'.join([f"• {item}" for item in items])
+        return '\n'.join(f"• {item}" for item in items)
     
     def _format_missing_info(self, missing_info: List[str]) -> str:
         """Format missing information section"""
@@ -928,58 +1534,87 @@ Here's a comprehensive analysis of the forwarded case email:
             return "• All essential information appears to be present"
         return '\n'.join(missing_info)
     
+    def process_case_parallel(self, text_content: str, email_body: str,
+                              police_texts: List[str], sender_email: str = "") -> Dict[str, Any]:
+        """Run the analysis steps for one case, overlapping those that don't depend on each other
+        
+        Case data and police reports are extracted concurrently. Missing
+        information, location risk, attorney verification and the
+        multi-report analysis then run in parallel.
+        """
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            case_future = executor.submit(self.extract_case_data, text_content, email_body)
+            # Police report extraction runs on copies of the extraction agent
+            police_future = executor.submit(self.process_multiple_police_reports, police_texts) if police_texts else None
+            
+            case_data = case_future.result()
+            missing_future = executor.submit(self.identify_missing_information, case_data)
+            
+            location_future = executor.submit(self.analyze_location_risk, case_data.accident_location)
+            # The state comes from the location string itself, so this need not wait for the analysis
+            attorney_future = executor.submit(
+                self.verify_attorney,
+                case_data.attorney_name,
+                case_data.attorney_email or sender_email,
+                self._split_location(case_data.accident_location)[2]
+            )
+            
+            police_reports = police_future.result() if police_future else []
+            multi_report_analysis = None
+            if len(police_texts) > 1:
+                multi_report_analysis = self.analyze_multiple_reports(case_data, police_reports)
+            
+            return {
+                'case_data': case_data,
+                'missing_info': missing_future.result(),
+                'location_analysis': location_future.result(),
+                'attorney_verification': attorney_future.result(),
+                'police_reports': police_reports,
+                'multi_report_analysis': multi_report_analysis,
+            }
+    
     def process_legal_case_email(self, email_body: str, pdf_attachments: List[str], 
                                sender_email: str, subject: str) -> str:
         """Main method to process a legal case email through the full pipeline"""
         try:
-            logger.info(f"Processing legal case email from {sender_email}")
+            logger.info("Processing legal case email from %s", sender_email)
             
-            # Step 1: Extract text from all PDF attachments
-            all_pdf_text = ""
-            for pdf_path in pdf_attachments:
+            # Step 1: Extract text from all PDF attachments, in parallel
+            futures = [self._pdf_pool.submit(pdf_path) for pdf_path in pdf_attachments]
+            pdf_sections = []
+            for pdf_path, future in zip(pdf_attachments, futures):
                 try:
-                    pdf_text = self.extract_text_from_pdf(pdf_path)
-                    all_pdf_text += f"\n\n--- {os.path.basename(pdf_path)} ---\n{pdf_text}"
+                    pdf_text = future.result()
+                    pdf_sections.append(f"\n\n--- {os.path.basename(pdf_path)} ---\n{pdf_text}")
                 except Exception as e:
-                    logger.error(f"Error processing PDF {pdf_path}: {e}")
-                    all_pdf_text += f"\n\n--- {os.path.basename(pdf_path)} ---\nError extracting text: {e}"
-            
-            # Step 2: Extract case data
-            case_data = self.extract_case_data(all_pdf_text, email_body)
-            
-            # Step 3: Identify missing information
-            missing_info = self.identify_missing_information(case_data)
-            
-            # Step 4: Analyze location risk
-            location_analysis = self.analyze_location_risk(case_data.accident_location)
-            
-            # Step 5: Verify attorney
-            attorney_verification = self.verify_attorney(
-                case_data.attorney_name, 
-                case_data.attorney_email or sender_email,
-                location_analysis.state
-            )
-            
-            # Step 6: Extract police report data (with multi-report support)
-            police_report_data = None
-            multi_report_analysis = None
+                    logger.error("Error processing PDF %s: %s", pdf_path, e)
+                    pdf_sections.append(f"\n\n--- {os.path.basename(pdf_path)} ---\nError extracting text: {e}")
+            all_pdf_text = "".join(pdf_sections)
             
-            # Check if we have potential police reports
-            if any(keyword in (subject.lower() + " " + email_body.lower() + " " + all_pdf_text.lower()) 
-                   for keyword in ['police report', 'incident report', 'accident report']):
+            # Step 2: Find police reports (with multi-report support)
+            police_texts = []
+            if any(POLICE_REPORT_RE.search(text) for text in (subject, email_body, all_pdf_text)):
                 
                 # Identify separate reports
                 potential_reports = self._identify_separate_reports(all_pdf_text)
                 
                 if len(potential_reports) > 1:
-                    logger.info(f"Found {len(potential_reports)} potential police reports")
-                    police_reports = self.process_multiple_police_reports(potential_reports)
-                    multi_report_analysis = self.analyze_multiple_reports(case_data, police_reports)
-                    # Use the first report for the main police report data
-                    police_report_data = police_reports[0] if police_reports else None
+                    logger.info("Found %s potential police reports", len(potential_reports))
+                    police_texts = potential_reports
                 else:
                     # Single report processing
-                    police_report_data = self.extract_police_report_data(all_pdf_text)
+                    police_texts = [all_pdf_text]
+            
+            # Steps 3-6: Case data, missing information, location risk, attorney
+            # verification and police reports, with independent steps in parallel
+            results = self.process_case_parallel(all_pdf_text, email_body, police_texts, sender_email)
+            case_data = results['case_data']
+            missing_info = results['missing_info']
+            location_analysis = results['location_analysis']
+            attorney_verification = results['attorney_verification']
+            multi_report_analysis = results['multi_report_analysis']
+            # Use the first report for the main police report data
+            police_report_data = results['police_reports'][0] if results['police_reports'] else None
             
             # Step 7: Generate comprehensive report
             report = self.generate_comprehensive_report(
@@ -992,7 +1627,7 @@ Here's a comprehensive analysis of the forwarded case email:
             return report
             
         except Exception as e:
-            logger.error(f"Error processing legal case email: {e}")
+            logger.error("Error processing legal case email: %s", e)
             return f"Error processing legal case: {e}"
 
 def main():
@@ -1084,6 +1719,7 @@ def main():
     print("COMPREHENSIVE LEGAL CASE REPORT WITH MULTI-REPORT ANALYSIS")
     print("="*80)
     print(report)
+    processor.shutdown()
 
 if __name__ == "__main__":
     main()
@@ -4,56 +4,116 @@ Simple PDF Knowledge Base Agent Demo
 """
 
 import os
+import json
+import asyncio
+from functools import lru_cache, partial
+
+import httpx
 from agno.agent import Agent
-from agno.knowledge.pdf import PDFKnowledgeBase
 from agno.models.openai import OpenAIChat
-from agno.embedder.openai import OpenAIEmbedder
-from agno.vectordb.lancedb import LanceDb, SearchType
-from agno.tools.reasoning import ReasoningTools
+from agno.vectordb.distance import Distance
+from agno.vectordb.lancedb import SearchType
 
-def demo_pdf_agent():
-    """Demonstrate the PDF agent with sample questions"""
-    
-    # Check if OpenAI API key is set
-    if not os.getenv("OPENAI_API_KEY"):
-        print("⚠️  Please set your OPENAI_API_KEY environment variable")
-        print("   export OPENAI_API_KEY='your-api-key-here'")
-        return
-    
-    print("🤖 Creating PDF Knowledge Base Agent...")
-    
-    # Create PDF knowledge base
-    pdf_knowledge = PDFKnowledgeBase(
+from knowledge_store import (
+    ArrowLanceDb, CachedOpenAIEmbedder, ParallelPDFKnowledgeBase, build_search_indexes,
+    sync_documents, vector_dimensions_match,
+)
+
+@lru_cache(maxsize=1)
+def get_http_client():
+    """Pooled HTTP client shared by the embedder and the chat model"""
+    return httpx.Client(limits=httpx.Limits(max_keepalive_connections=32))
+
+@lru_cache(maxsize=1)
+def get_embedder():
+    """Shared embedder (one on-disk cache per process)"""
+    return CachedOpenAIEmbedder(
+        id="text-embedding-3-small", 
+        dimensions=512,
+        cache_dir="tmp/embedding_cache",
+        client_params={"http_client": get_http_client()},
+    )
+
+@lru_cache(maxsize=1)
+def get_knowledge_base():
+    """PDF knowledge base, loaded and indexed on first use"""
+    pdf_knowledge = ParallelPDFKnowledgeBase(
         path="knowledge_base.pdf",
-        vector_db=LanceDb(
+        vector_db=ArrowLanceDb(
             uri="tmp/pdf_lancedb",
             table_name="pdf_knowledge",
-            search_type=SearchType.hybrid,
-            embedder=OpenAIEmbedder(
-                id="text-embedding-3-small", 
-                dimensions=1536
-            ),
+            search_type=SearchType.vector,
+            distance=Distance.max_inner_product,
+            embedder=get_embedder(),
         ),
     )
     
-    # Create the agent
-    agent = Agent(
+    print("📚 Loading PDF knowledge base...")
+    if not vector_dimensions_match(pdf_knowledge.vector_db):
+        pdf_knowledge.vector_db.drop()
+    # Only new or changed chunks are embedded (in batches) and written
+    sync_documents(pdf_knowledge.vector_db, (doc for docs in pdf_knowledge.document_lists for doc in docs))
+    build_search_indexes(pdf_knowledge.vector_db)
+    return pdf_knowledge
+
+@lru_cache(maxsize=1)
+def get_agent():
+    """Shared PDF Knowledge Assistant"""
+    return Agent(
         name="PDF Knowledge Assistant",
-        model=OpenAIChat(id="gpt-4o-mini"),
+        # Answers come back as one JSON object keyed by question
+        model=OpenAIChat(
+            id="gpt-4o-mini",
+            response_format={"type": "json_object"},
+            http_client=get_http_client(),
+        ),
         instructions=[
             "You are a helpful assistant that answers questions based on PDF knowledge.",
-            "Always search your knowledge base before answering.",
+            "Answer each question in the given list using the references from the knowledge base.",
             "Include relevant details from the PDF.",
             "Use clear formatting in your answers.",
+            "Return a JSON object mapping each question to its answer.",
         ],
-        knowledge=pdf_knowledge,
-        tools=[ReasoningTools(add_instructions=True)],
         markdown=True,
     )
+
+async def retrieve_references(knowledge, questions, num_documents=5):
+    """Search the knowledge base for every question concurrently and drop duplicate passages"""
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*(
+        loop.run_in_executor(None, partial(knowledge.search, query=question, num_documents=num_documents))
+        for question in questions
+    ))
     
-    # Load the knowledge base
-    print("📚 Loading PDF knowledge base...")
-    agent.knowledge.load(recreate=False)
+    references = {}
+    for documents in results:
+        for document in documents:
+            references.setdefault(document.content, document)
+    return list(references.values())
+
+def answer_questions(questions):
+    """Answer all questions with a single LLM call over the shared references"""
+    references = asyncio.run(retrieve_references(get_knowledge_base(), questions))
+    message = "\n\n".join([
+        "References from the knowledge base:",
+        *(document.content for document in references),
+        f"Questions: {json.dumps(questions)}",
+    ])
+    
+    response = get_agent().run(message)
+    return json.loads(response.content)
+
+def demo_pdf_agent():
+    """Demonstrate the PDF agent with sample questions"""
+    
+    # Check if OpenAI API key is set
+    if not os.getenv("OPENAI_API_KEY"):
+        print("⚠️  Please set your OPENAI_API_KEY environment variable")
+        print("   export OPENAI_API_KEY='your-api-key-here'")
+        return
+    
+    print("🤖 Creating PDF Knowledge Base Agent...")
+    get_knowledge_base()
     
     print("✅ Agent ready! Asking sample questions...\n")
     
@@ -65,11 +125,13 @@ def demo_pdf_agent():
         "What are the key benefits of AI?",
     ]
     
+    answers = answer_questions(questions)
+    
     for i, question in enumerate(questions, 1):
         print(f"🤔 Question {i}: {question}")
         print("="*50)
         
-        agent.print_response(question, stream=False)
+        print(answers.get(question, "No answer returned."))
         
         print("\n" + "="*50 + "\n")
 
@@ -11,7 +11,7 @@ import sys
 import tempfile
 import logging
 from pathlib import Path
-from email_config import EmailPDFConfig
+from email_config import CONFIG
 from email_pdf_agent import EmailPDFAgent
 
 # Configure logging for testing
@@ -22,7 +22,7 @@ def test_configuration():
     """Test the configuration"""
     print("🔧 Testing Configuration...")
     
-    missing = EmailPDFConfig.validate_config()
+    missing = CONFIG.validate_config()
     
     if missing:
         print("❌ Configuration Test Failed")
@@ -40,7 +40,7 @@ def test_email_connection():
     
     try:
         # Create agent with test mode
-        config = EmailPDFConfig.get_config_dict()
+        config = CONFIG.get_config_dict()
         agent = EmailPDFAgent(config)
         
         # Test IMAP connection
@@ -68,7 +68,7 @@ def test_llm_connection():
     print("\n🤖 Testing LLM Connection...")
     
     try:
-        config = EmailPDFConfig.get_config_dict()
+        config = CONFIG.get_config_dict()
         agent = EmailPDFAgent(config)
         
         # Test with a simple summarization task
@@ -131,7 +131,7 @@ def test_pdf_processing():
         doc.build(story)
         
         # Test PDF processing
-        config = EmailPDFConfig.get_config_dict()
+        config = CONFIG.get_config_dict()
         agent = EmailPDFAgent(config)
         
         print("   Testing PDF text extraction...")
@@ -164,7 +164,7 @@ def test_email_sending():
     print("\n📤 Testing Email Sending...")
     
     try:
-        config = EmailPDFConfig.get_config_dict()
+        config = CONFIG.get_config_dict()
         agent = EmailPDFAgent(config)
         
         # Send test email
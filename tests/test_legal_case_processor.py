@@ -15,13 +15,46 @@ import sys
 import tempfile
 import logging
 from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+from email.mime.multipart import MIMEMultipart
 from legal_case_processor import LegalCaseProcessor, CaseData
 from legal_case_monitor import LegalCaseMonitor
+import legal_case_monitor
 
 # Configure logging for testing
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+def offline_config():
+    """Configuration for tests that make no network calls"""
+    return {
+        'imap_server': 'imap.example.com',
+        'imap_port': 993,
+        'email_address': 'monitor@example.com',
+        'email_password': 'password',
+        'monitor_folder': 'INBOX',
+        'smtp_server': 'smtp.example.com',
+        'smtp_port': 587,
+        'sender_email': 'monitor@example.com',
+        'sender_password': 'password',
+        'recipient_email': 'ron@example.com',
+        'check_interval': 60,
+        'max_pdf_size': 10485760,
+        'process_all_pdfs': True,
+        'model_provider': 'openai',
+        'model_name': 'gpt-4o-mini',
+        'max_tokens': 4000,
+        'temperature': 0.1,
+        'sender_whitelist': [],
+        'subject_keywords': [],
+        'analysis_cache_db': ':memory:',
+        'processed_emails_db': ':memory:',
+    }
+
+# Configuration validation only checks that a key is set; no request is made
+OFFLINE_ENV = {'OPENAI_API_KEY': os.getenv('OPENAI_API_KEY') or 'offline-test-key'}
+
 def test_case_data_extraction():
     """Test case data extraction functionality"""
     print("🔍 Testing Case Data Extraction...")
@@ -421,6 +454,77 @@ def test_full_pipeline():
         print(f"❌ Full Pipeline Test Failed: {e}")
         return False
 
+def test_clear_caches():
+    """Test that clearing the lookup caches makes location and attorney lookups run again"""
+    print("\n🧹 Testing Lookup Cache Clearing...")
+    
+    try:
+        with mock.patch.dict(os.environ, OFFLINE_ENV):
+            processor = LegalCaseProcessor(offline_config())
+        
+        try:
+            # Stand-in for the agents, so no request is made
+            agent_run = mock.Mock(return_value=SimpleNamespace(
+                content="Tort-friendly jurisdiction; the attorney appears legitimate and professional."
+            ))
+            with mock.patch.object(processor, '_cached_run', agent_run):
+                processor.analyze_location_risk("Los Angeles, CA")
+                processor.verify_attorney("Sarah Levine", "sarah@levinelaw.com", "CA")
+                # Same lookups, formatted differently, are served from the caches
+                processor.analyze_location_risk("los angeles,  CA")
+                processor.verify_attorney(" sarah  LEVINE", "Sarah@LevineLaw.com ", "ca")
+                assert agent_run.call_count == 2, "Repeated lookups should be cached"
+                
+                processor.clear_caches()
+                
+                processor.analyze_location_risk("Los Angeles, CA")
+                processor.verify_attorney("Sarah Levine", "sarah@levinelaw.com", "CA")
+                assert agent_run.call_count == 4, "Lookups should run again after clear_caches()"
+        finally:
+            processor.shutdown()
+        
+        print("   ✅ Repeated lookups served from the caches")
+        print("   ✅ Location and attorney lookups run again after clearing")
+        print("✅ Lookup Cache Clearing Test Passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Lookup Cache Clearing Test Failed: {e}")
+        return False
+
+def test_smtp_connection_reuse():
+    """Test that emails handled by concurrent workers share one SMTP session"""
+    print("\n📤 Testing SMTP Connection Reuse...")
+    
+    try:
+        with mock.patch.dict(os.environ, OFFLINE_ENV), \
+                mock.patch.object(legal_case_monitor.smtplib, 'SMTP') as smtp_class:
+            smtp_class.return_value.noop.return_value = (250, b'OK')
+            monitor = LegalCaseMonitor(offline_config())
+            
+            def send_report(worker, email_data, pdf_attachments):
+                worker._send_message(MIMEMultipart())
+            
+            try:
+                with mock.patch.object(LegalCaseMonitor, '_handle_legal_case', send_report):
+                    monitor._process_email({'subject': 'Auto Accident Case - Jane Doe', 'attachments': []})
+                    monitor._process_email({'subject': 'Slip and Fall Case - Maria Rodriguez', 'attachments': []})
+                monitor.close()
+            finally:
+                monitor.shutdown()
+        
+        assert smtp_class.call_count == 1, f"Expected one SMTP connection, got {smtp_class.call_count}"
+        assert smtp_class.return_value.send_message.call_count == 2, "Both reports should be sent"
+        assert smtp_class.return_value.quit.call_count == 1, "close() should end the shared session"
+        
+        print("   ✅ Two emails sent over one SMTP connection")
+        print("✅ SMTP Connection Reuse Test Passed")
+        return True
+        
+    except Exception as e:
+        print(f"❌ SMTP Connection Reuse Test Failed: {e}")
+        return False
+
 def run_all_tests():
     """Run all legal case processing tests"""
     print("🧪 Legal Case Processing System Test Suite")
@@ -433,6 +537,8 @@ def run_all_tests():
         ("Attorney Verification", test_attorney_verification),
         ("Comprehensive Report Generation", test_comprehensive_report_generation),
         ("Legal Case Email Detection", test_legal_case_email_detection),
+        ("Lookup Cache Clearing", test_clear_caches),
+        ("SMTP Connection Reuse", test_smtp_connection_reuse),
         ("Full Pipeline", test_full_pipeline),
     ]
     
@@ -495,8 +601,12 @@ def main():
             test_legal_case_email_detection()
         elif test_name == "pipeline":
             test_full_pipeline()
+        elif test_name == "cache":
+            test_clear_caches()
+        elif test_name == "smtp":
+            test_smtp_connection_reuse()
         else:
-            print("Usage: python test_legal_case_processor.py [extraction|missing|location|attorney|report|detection|pipeline]")
+            print("Usage: python test_legal_case_processor.py [extraction|missing|location|attorney|report|detection|pipeline|cache|smtp]")
             print("   or: python test_legal_case_processor.py (to run all tests)")
     else:
         run_all_tests()